@@ -1,8 +1,18 @@
 """
-This file handles all (except websocket) interactions with Discord
+This file handles all (except websocket, look at gateway.py) interactions with Discord
 """
 import enum
-import requests
+import threading
+import time
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+from libs.ratelimit import routeKey, getRateLimiter
+
+if TYPE_CHECKING:  # requests is only imported by the first SessionPool, it is slow to import (startup time)
+    import requests
+    from requests.adapters import HTTPAdapter
+
+MAX_RETRIES = 3  # how many times a request is retried after a 429
 
 
 class VERSION(enum.StrEnum):
@@ -22,7 +32,7 @@ class Request:
     Only thing that matters is that version is the version (enum above) and route is the /blah/blah to the location.
     """
 
-    def __init__(self, version: VERSION, method: str, route: str, params=None, headers: dict = None, json=None):
+    def __init__(self, version: VERSION | str, method: str, route: str, params=None, headers: dict = None, json=None):
         self.version = version
         self.method = method.upper()
         self.route = route
@@ -30,13 +40,139 @@ class Request:
         self.headers = headers if headers else {}
         self.json = json
 
+    @property
+    def url(self) -> str:
+        # plain strings are allowed as the version for local servers (benchmarks, fake gateway, etc.)
+        return (self.version.value if isinstance(self.version, VERSION) else self.version) + self.route
+
+    @property
+    def bucket(self) -> str:
+        """
+        The rate limit key this request is counted against.
+        """
+        return routeKey(self.method, self.route)
+
     def execute(self):
-        url = self.version.value + self.route
-        return _request(self.method, url, headers=self.headers, json=self.json, params=self.params)
+        """
+        Sends the request, waiting for the rate limit if needed and retrying (up to MAX_RETRIES) on a 429.
+        :return: The requests.Response
+        """
+        url = self.url
+        limiter = getRateLimiter()
+        key = self.bucket
+
+        for _ in range(MAX_RETRIES + 1):
+            while (wait := limiter.reserve(key)) > 0:
+                time.sleep(wait)
+
+            try:
+                res = _request(self.method, url, headers=self.headers, json=self.json, params=self.params)
+            except Exception:
+                limiter.release(key)  # give the slot back so others don't wait on a request that never returns
+                raise
+
+            body = None
+            if res.status_code == 429:
+                try:
+                    body = res.json()
+                except ValueError:  # cloudflare bans are not json
+                    pass
+
+            if limiter.update(key, res.status_code, res.headers, body) == 0:
+                return res
+
+        return res
+
+
+class SessionPool:
+    """
+    A shared keep-alive HTTP session, every request made through `_request` goes through here.
+    Each host (the API and the CDN) gets its own bounded connection pool, so connections (and the TLS handshake)
+    are reused between calls and between threads.
+    :param int poolSize: The maximum amount of kept-alive connections per host.
+    :param list hosts: The base urls to create pools for (any other host falls back to the default requests adapter).
+    """
+
+    def __init__(self, poolSize: int = 10, hosts: list = None):
+        if hosts is None:
+            hosts = [VERSION.V9, VERSION.CDN]
+
+        import requests
+
+        self.poolSize = poolSize
+        self.session = requests.Session()
+        self.adapters: dict[str, "HTTPAdapter"] = {}
+
+        for host in hosts:
+            self.mount(host)
+
+    def mount(self, url: str) -> "HTTPAdapter":
+        """
+        Creates (or returns the existing) pool for the host of the url.
+        :param str url: Any url on the host.
+        :return: The adapter owning the pool for that host.
+        """
+        parts = urlsplit(str(url))
+        prefix = f"{parts.scheme}://{parts.netloc}/"
+
+        if prefix not in self.adapters:
+            from requests.adapters import HTTPAdapter
+
+            # pool_block makes threads wait for a free connection instead of opening (and throwing away) extra ones
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.poolSize, pool_block=True)
+            self.session.mount(prefix, adapter)
+            self.adapters[prefix] = adapter
+
+        return self.adapters[prefix]
+
+    def request(self, method: str, url: str, params=None, headers: dict = None, json=None) -> "requests.Response":
+        return self.session.request(method, url, params=params, headers=headers, json=json)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """
+        Pool statistics per host.
+        A miss is a request that had to open a new connection, a hit is one that reused a kept-alive connection.
+        :return: {host: {"requests": int, "hits": int, "misses": int}}
+        """
+        out = {}
+        for prefix, adapter in self.adapters.items():
+            requestCount = 0
+            misses = 0
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:  # evicted while we were looking
+                    continue
+                requestCount += pool.num_requests
+                misses += pool.num_connections
+
+            out[prefix] = {"requests": requestCount, "hits": max(requestCount - misses, 0), "misses": misses}
+
+        return out
 
+    def close(self):
+        self.session.close()
 
-def _request(method: str, url: str, params=None, headers: dict = None, json=None) -> requests.Response:
-    req = requests.request(method, url, params=params, headers=headers, json=json)
+
+GLOBAL_SessionPool: SessionPool | None = None
+_sessionLock = threading.Lock()
+
+
+def getSessionPool() -> SessionPool:
+    """
+    Returns the shared SessionPool (created on first use).
+    """
+    global GLOBAL_SessionPool
+    if GLOBAL_SessionPool is None:
+        with _sessionLock:
+            if GLOBAL_SessionPool is None:
+                GLOBAL_SessionPool = SessionPool()
+
+    return GLOBAL_SessionPool
+
+
+def _request(method: str, url: str, params=None, headers: dict = None, json=None) -> "requests.Response":
+    req = getSessionPool().request(method, url, params=params, headers=headers, json=json)
 
     return req
 
@@ -48,6 +184,16 @@ def login(username: str, password: str) -> LOGIN | str:
     :param password:
     :return: Token in string format (or ERROR)
     """
+    req = _loginRequest(username, password)
+
+    res = req.execute()
+
+    json_res = res.json()
+
+    return _loginResult(res.status_code, json_res)
+
+
+def _loginRequest(username: str, password: str) -> Request:
     headers = {
         "accept": "*/*",
         "accept-language": "en-US",
@@ -74,14 +220,11 @@ def login(username: str, password: str) -> LOGIN | str:
         "gift_code_sku_id": None
     }
 
-    req = Request(VERSION.V9, "POST", "/auth/login", headers=headers, json=payload)
-
-    res = req.execute()
+    return Request(VERSION.V9, "POST", "/auth/login", headers=headers, json=payload)
 
-    json_res = res.json()
-    print(json_res)
 
-    if res.status_code != 200:
+def _loginResult(status_code: int, json_res: dict) -> LOGIN | str:
+    if status_code != 200:
         # assume login error (there's a possibility it's an captcha error but that's a later me issue!
         # TODO: (read above)
         errs = json_res["errors"]["login"]["_errors"]
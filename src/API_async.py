@@ -0,0 +1,152 @@
+"""
+asyncio version of the API.py client (still no websocket, look at gateway for that)
+Uses the same Request/VERSION objects and the same rate limiter as the blocking client,
+so both can be used at the same time without going over the limits.
+"""
+import asyncio
+import json as jsonlib
+import logging
+import aiohttp
+from API import Request, LOGIN, MAX_RETRIES, _loginRequest, _loginResult
+from libs.ratelimit import getRateLimiter
+
+
+class AsyncResponse:
+    """
+    The parts of a response we care about, read fully so the connection can go back to the pool right away.
+    Mirrors the requests.Response attributes used in API.py.
+    """
+
+    def __init__(self, status_code: int, headers, content: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def json(self):
+        return jsonlib.loads(self.content)
+
+
+class AsyncSessionPool:
+    """
+    The asyncio counterpart of API.SessionPool.
+    One aiohttp session with a bounded amount of kept-alive connections per host.
+    WARN: Must be created and used from inside the same event loop.
+    :param int poolSize: The maximum amount of kept-alive connections per host.
+    """
+
+    def __init__(self, poolSize: int = 10):
+        self.poolSize = poolSize
+        self.hits = 0
+        self.misses = 0
+
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_create_end.append(self._onMiss)
+        trace.on_connection_reuseconn.append(self._onHit)
+
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=0, limit_per_host=poolSize),
+            trace_configs=[trace]
+        )
+        self.loop = asyncio.get_running_loop()
+
+    async def _onMiss(self, session, ctx, params):
+        self.misses += 1
+
+    async def _onHit(self, session, ctx, params):
+        self.hits += 1
+
+    async def request(self, method: str, url: str, params=None, headers: dict = None, json=None) -> AsyncResponse:
+        async with self.session.request(method, url, params=params or None, headers=headers, json=json) as res:
+            return AsyncResponse(res.status, res.headers, await res.read())
+
+    def stats(self) -> dict[str, int]:
+        """
+        :return: {"requests": int, "hits": int, "misses": int}
+        """
+        return {"requests": self.hits + self.misses, "hits": self.hits, "misses": self.misses}
+
+    async def close(self):
+        await self.session.close()
+
+
+GLOBAL_AsyncSessionPool: AsyncSessionPool | None = None
+
+
+def getAsyncSessionPool() -> AsyncSessionPool:
+    """
+    Returns the shared AsyncSessionPool of the running loop (created on first use).
+    """
+    global GLOBAL_AsyncSessionPool
+    loop = asyncio.get_running_loop()
+    if GLOBAL_AsyncSessionPool is None or GLOBAL_AsyncSessionPool.loop is not loop:
+        old = GLOBAL_AsyncSessionPool
+        if old is not None and not old.session.closed:
+            # the session belongs to the old loop, it has to be closed there (or its connector leaks)
+            if old.loop.is_closed():
+                logging.getLogger("API_async").warning("the loop of the shared AsyncSessionPool was closed before "
+                                                       "the pool, its connections could not be closed")
+            else:
+                asyncio.run_coroutine_threadsafe(old.close(), old.loop)
+        GLOBAL_AsyncSessionPool = AsyncSessionPool()
+
+    return GLOBAL_AsyncSessionPool
+
+
+async def execute(req: Request, pool: AsyncSessionPool = None) -> AsyncResponse:
+    """
+    Sends a Request without blocking the loop, waiting for the rate limit if needed (same rules as Request.execute).
+    :param Request req: The request to send.
+    :param AsyncSessionPool pool: The pool to send through (optional defaults to the shared one).
+    :return: AsyncResponse
+    """
+    if pool is None:
+        pool = getAsyncSessionPool()
+
+    limiter = getRateLimiter()
+    key = req.bucket
+    url = req.url
+
+    for _ in range(MAX_RETRIES + 1):
+        while (wait := limiter.reserve(key)) > 0:
+            await asyncio.sleep(wait)
+
+        try:
+            res = await pool.request(req.method, url, params=req.params, headers=req.headers, json=req.json)
+        except BaseException:  # includes cancellation
+            limiter.release(key)
+            raise
+
+        body = None
+        if res.status_code == 429:
+            try:
+                body = res.json()
+            except ValueError:
+                pass
+
+        if limiter.update(key, res.status_code, res.headers, body) == 0:
+            return res
+
+    return res
+
+
+async def executeMany(reqs: list[Request], pool: AsyncSessionPool = None) -> list[AsyncResponse | BaseException]:
+    """
+    Sends every request at once (still paced by the rate limiter).
+    A failed request does not cancel the others, its exception is returned in its place.
+    :param list[Request] reqs: The requests to send.
+    :param AsyncSessionPool pool: The pool to send through (optional defaults to the shared one).
+    :return: The responses, in the same order as reqs.
+    """
+    return await asyncio.gather(*(execute(r, pool) for r in reqs), return_exceptions=True)
+
+
+async def login(username: str, password: str) -> LOGIN | str:
+    """
+    Same as API.login but non-blocking.
+    :param username:
+    :param password:
+    :return: Token in string format (or ERROR)
+    """
+    res = await execute(_loginRequest(username, password))
+
+    return _loginResult(res.status_code, res.json())
@@ -0,0 +1,4 @@
+"""
+Benchmarks, run from the src folder as modules (ex: python -m benchmarks.bench_api_async)
+These are NOT tests, they print (and sometimes save) timings to compare between changes.
+"""
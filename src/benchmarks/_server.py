@@ -0,0 +1,44 @@
+"""
+A tiny local http server that pretends to be the Discord REST api (every route returns an empty message list).
+"""
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, otherwise the pools have nothing to reuse
+    latency = 0.0
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length", 0))
+        if length:
+            self.rfile.read(length)
+
+        time.sleep(self.latency)
+        body = b"[]"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _reply
+    do_POST = _reply
+
+    def log_message(self, format, *args):
+        pass
+
+
+def startServer(latency: float = 0.02) -> tuple[ThreadingHTTPServer, str]:
+    """
+    Starts the server on a free port in a daemon thread.
+    :param float latency: Seconds every response is held back (simulates the round trip).
+    :return: (server, base url)
+    """
+    handler = type("Handler", (_Handler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
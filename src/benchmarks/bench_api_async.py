@@ -0,0 +1,49 @@
+"""
+Compares the wall time of sending N requests sequentially (API.Request.execute) vs all at once (API_async.executeMany)
+usage: python -m benchmarks.bench_api_async [count] [latency]
+"""
+import asyncio
+import sys
+import time
+import API
+import API_async
+from libs import ratelimit
+from benchmarks._server import startServer
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.02
+
+    # the local server has no limits, don't let the real global limit hide the difference
+    ratelimit.GLOBAL_RateLimiter = ratelimit.RateLimiter(globalLimit=10 ** 9)
+
+    server, base = startServer(latency)
+    API.getSessionPool().mount(base)
+    reqs = [API.Request(base, "GET", f"/channels/{i}/messages") for i in range(count)]
+
+    start = time.perf_counter()
+    for r in reqs:
+        r.execute()
+    sequential = time.perf_counter() - start
+    syncStats = API.getSessionPool().stats()
+
+    async def runAsync():
+        pool = API_async.AsyncSessionPool()
+        s = time.perf_counter()
+        await API_async.executeMany(reqs, pool)
+        took = time.perf_counter() - s
+        await pool.close()
+        return took, pool.stats()
+
+    concurrent, asyncStats = asyncio.run(runAsync())
+
+    server.shutdown()
+    print(f"{count} requests, {latency * 1000:.0f}ms latency")
+    print(f"sequential: {sequential:.3f}s ({count / sequential:.1f} req/s) pool: {syncStats}")
+    print(f"async:      {concurrent:.3f}s ({count / concurrent:.1f} req/s) pool: {asyncStats}")
+    print(f"speedup:    {sequential / concurrent:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
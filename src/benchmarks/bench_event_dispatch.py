@@ -0,0 +1,73 @@
+"""
+Micro-benchmark of the cost of one event: allocation (slotted vs the old __dict__ events) and dispatch
+(the old if/elif chain on type codes vs Dispatcher).
+usage: python -m benchmarks.bench_event_dispatch [count]
+"""
+import sys
+import timeit
+import tracemalloc
+from libs import events as ev
+
+
+class _DictEvent:
+    """
+    How events used to be built (for comparison only).
+    """
+    def __init__(self, eventType: int):
+        self.__dict__ = {}
+        self.type = eventType
+
+
+class _DictTokenEvent(_DictEvent):
+    def __init__(self, t: int, token: str):
+        super().__init__(t)
+        self.token = token
+
+
+def _bytesPerEvent(factory, count: int) -> float:
+    tracemalloc.start()
+    keep = [factory() for _ in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del keep
+    return size / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+    dictNs = timeit.timeit(lambda: _DictTokenEvent(2, "token"), number=count) / count * 1e9
+    slotNs = timeit.timeit(lambda: ev.TokenDataEvent(2, "token"), number=count) / count * 1e9
+    print(f"alloc  __dict__: {dictNs:7.1f}ns {_bytesPerEvent(lambda: _DictTokenEvent(2, 'token'), count):6.1f}B/event")
+    print(f"alloc  slots:    {slotNs:7.1f}ns {_bytesPerEvent(lambda: ev.TokenDataEvent(2, 'token'), count):6.1f}B/event")
+
+    events = [ev.TokenDataEvent(2, "t"), ev.RequestToken(), ev.GatewayDispatchEvent("MESSAGE_CREATE", {})] * (count // 3)
+    sink = []
+
+    def chain():
+        for ge in events:
+            if ge.type == 2:
+                sink.append(ge.token)
+            elif ge.type == 7:
+                sink.append(None)
+            elif ge.type == 17:
+                sink.append(ge.name)
+        sink.clear()
+
+    dispatcher = ev.Dispatcher()
+    dispatcher.register(ev.TokenDataEvent, lambda ge: sink.append(ge.token))
+    dispatcher.register(ev.RequestToken, lambda ge: sink.append(None))
+    dispatcher.register(ev.GatewayDispatchEvent, lambda ge: sink.append(ge.name))
+
+    def table():
+        dispatcher.dispatchAll(events)
+        sink.clear()
+
+    chainNs = timeit.timeit(chain, number=5) / 5 / len(events) * 1e9
+    tableNs = timeit.timeit(table, number=5) / 5 / len(events) * 1e9
+    print(f"dispatch if/elif:   {chainNs:6.1f}ns/event")
+    print(f"dispatch Dispatcher: {tableNs:6.1f}ns/event")
+
+
+if __name__ == "__main__":
+    main()
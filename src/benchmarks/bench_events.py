@@ -0,0 +1,59 @@
+"""
+Measures the wake latency of the events system: the time between pushEvent on one thread and the consumer seeing it.
+Compares waitEvents against the old sleep(0.1) polling loop.
+usage: python -m benchmarks.bench_events [count]
+"""
+import statistics
+import sys
+import threading
+import time
+from libs import events as ev
+
+
+class _PingEvent(ev.Event):
+    __slots__ = ("sent",)
+    LANE = ev.BACKEND
+
+    def __init__(self):
+        super().__init__(22)  # backend event
+        self.sent = time.perf_counter()
+
+
+def _consumer(count: int, latencies: list, polling: bool):
+    while len(latencies) < count:
+        if polling:
+            found = ev.popEvents(ev.BACKEND)
+        else:
+            found = ev.waitEvents(ev.BACKEND, timeout=1)
+
+        now = time.perf_counter()
+        for e in found:
+            latencies.append(now - e.sent)
+
+        if polling:
+            time.sleep(0.1)
+
+
+def run(count: int, polling: bool) -> list[float]:
+    latencies = []
+    t = threading.Thread(target=_consumer, args=(count, latencies, polling))
+    t.start()
+    for _ in range(count):
+        time.sleep(0.005 if not polling else 0.013)  # spread the pushes, like real traffic
+        ev.pushEvent(_PingEvent())
+    t.join()
+    return latencies
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    ev.init()
+
+    for name, polling in (("polling (sleep 0.1)", True), ("waitEvents", False)):
+        lat = sorted(run(count, polling))
+        print(f"{name:20} p50 {statistics.median(lat) * 1000:8.3f}ms  "
+              f"p99 {lat[int(len(lat) * 0.99) - 1] * 1000:8.3f}ms  max {lat[-1] * 1000:8.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Measures how fast GatewayClient decodes dispatches (events/sec) and how much memory it uses, against FakeGateway.
+usage: python -m benchmarks.bench_gateway [count | recording.jsonl] [--raw]
+(--raw disables zlib-stream)
+"""
+import asyncio
+import sys
+import threading
+import time
+import tracemalloc
+import logging
+from gateway import GatewayClient
+from benchmarks.fake_gateway import FakeGateway, syntheticRecording, loadRecording
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    compress = "--raw" not in sys.argv
+    if args and not args[0].isdigit():
+        recording = loadRecording(args[0])
+    else:
+        recording = syntheticRecording(int(args[0]) if args else 20000)
+
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    gateway = FakeGateway(recording)
+    url = asyncio.run_coroutine_threadsafe(gateway.start(), loop).result()
+
+    total = len(recording) + 1  # + READY
+    done = threading.Event()
+    times = {}
+
+    def onDispatch(name, data):
+        if name == "READY":
+            times["start"] = time.perf_counter()
+        if client.dispatchCount >= total:
+            times["end"] = time.perf_counter()
+            done.set()
+
+    tracemalloc.start()
+    client = GatewayClient("fake-token", url=url, compress=compress, onDispatch=onDispatch, level=logging.WARNING)
+    client.start()
+    if not done.wait(300):
+        print(f"timed out after {client.dispatchCount}/{total} dispatches")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    client.stop()
+    asyncio.run_coroutine_threadsafe(gateway.close(), loop).result()
+
+    took = times["end"] - times["start"]
+    print(f"{len(recording)} dispatches ({'zlib-stream' if compress else 'plain'})")
+    print(f"time:   {took:.3f}s ({len(recording) / took:.0f} events/s)")
+    print(f"memory: {peak / 1024:.0f} KiB peak (traced, includes the server)")
+
+
+if __name__ == "__main__":
+    main()
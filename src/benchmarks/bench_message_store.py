@@ -0,0 +1,60 @@
+"""
+Fills a MessageStore with synthetic messages and measures insert time, channel switch time from memory vs a
+simulated REST fetch, the hit rate and the memory estimate.
+usage: python -m benchmarks.bench_message_store [messages] [channels]
+"""
+import random
+import sys
+import time
+import tracemalloc
+from message_store import MessageStore, PAGE_SIZE
+
+FETCH_LATENCY = 0.1  # a typical REST round trip
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    channelCount = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    perChannel = total // channelCount
+
+    def fakeFetch(channelId, token, before, limit):
+        time.sleep(FETCH_LATENCY)
+        newest = perChannel if before is None else before - int(channelId) * 10 ** 6
+        ids = range(newest - 1, max(newest - 1 - limit, -1), -1)
+        return [{"id": str(int(channelId) * 10 ** 6 + i), "content": f"message {i} in {channelId}"} for i in ids]
+
+    store = MessageStore(maxMessages=total, fetch=fakeFetch)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for c in range(channelCount):
+        msgs = [{"id": str(c * 10 ** 6 + i), "content": f"message {i} in {c} " + "x" * (i % 40)}
+                for i in range(perChannel)]
+        random.shuffle(msgs[-PAGE_SIZE:])  # some out of order arrivals
+        store.add(str(c), msgs)
+    insert = time.perf_counter() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    switches = 10000
+    start = time.perf_counter()
+    for _ in range(switches):
+        store.history(str(random.randrange(channelCount)), "token")
+    switch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    store.history(str(channelCount + 1), "token")  # not cached, goes through the (fake) api
+    miss = time.perf_counter() - start
+
+    stats = store.stats()
+    print(f"{stats['messages']} messages in {stats['channels']} channels")
+    print(f"insert:          {insert:.3f}s ({stats['messages'] / insert:.0f} msg/s)")
+    print(f"switch (memory): {switch / switches * 1e6:.1f}us per channel switch")
+    print(f"switch (fetch):  {miss * 1000:.1f}ms")
+    print(f"hit rate:        {stats['hitRate'] * 100:.2f}% ({stats['hits']} hits, {stats['misses']} misses)")
+    print(f"memory:          {stats['estimatedBytes'] / 2 ** 20:.1f}MiB estimated, {memory / 2 ** 20:.1f}MiB traced")
+    print(f"evictions:       {stats['evictions']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Presents full frames through CScaleScreen at a few window sizes, and counts the scale buffer allocations.
+Only the first frame (and every resize) should allocate.
+Then the same with dirty rects (the same few widget areas every frame, like typing in the login menu),
+where the subsurfaces of each area should only be made once.
+Runs headless (SDL dummy video driver).
+usage: python -m benchmarks.bench_scale_present [frames]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame  # noqa: E402 ; the driver has to be set before pygame starts
+from libs import ui  # noqa: E402
+
+LOGICAL = (1080, 720)
+SIZES = [(1080, 720), (1280, 720), (1920, 1080), (800, 600)]
+
+
+def run(size: tuple[int, int], frames: int, smooth: bool) -> tuple[float, int, int]:
+    screen = ui.CScaleScreen(size=LOGICAL, smooth=smooth)
+    pygame.display.set_mode(size, pygame.RESIZABLE)  # the window now differs from the logical size
+    screen.surface = pygame.display.get_surface()
+    screen.fill(ui.CUColor((43, 45, 49)))
+    screen.present()  # warm up, allocates the buffer
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    start = time.perf_counter()
+    for _ in range(frames):
+        screen.fill(ui.CUColor((43, 45, 49)))
+        screen.present()
+    took = (time.perf_counter() - start) / frames
+    grown = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(before, "filename"))
+    tracemalloc.stop()
+
+    return took, screen.scaleAllocations, grown
+
+
+def runDirty(size: tuple[int, int], frames: int) -> tuple[float, int, int]:
+    screen = ui.CScaleScreen(size=LOGICAL, dirty=True)
+    pygame.display.set_mode(size, pygame.RESIZABLE)
+    screen.surface = pygame.display.get_surface()
+    screen.fill(ui.CUColor((43, 45, 49)))
+    screen.present()
+    areas = [(440, 350, 200, 75), (440, 450, 200, 75), (440, 600, 200, 25)]  # the login inputs and status
+
+    for area in areas:  # warm up, every area makes its subsurfaces once
+        screen.mark_dirty(area)
+    screen.present()
+
+    start = time.perf_counter()
+    for i in range(frames):
+        screen.mark_dirty(areas[i % len(areas)])
+        screen.present()
+    took = (time.perf_counter() - start) / frames
+
+    return took, screen.scaleAllocations, screen.subsurfaceAllocations
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    pygame.init()
+
+    for smooth in (False, True):
+        for size in SIZES:
+            took, allocations, grown = run(size, frames, smooth)
+            print(f"{'smoothscale' if smooth else 'scale':11} {size[0]:4}x{size[1]:<4} {took * 1000:7.3f}ms per frame, "
+                  f"{allocations} buffer allocations, python heap {grown:+d}B over {frames} frames")
+
+    for size in SIZES[1:]:  # the same size is a plain blit, nothing to allocate
+        took, allocations, subsurfaces = runDirty(size, frames)
+        print(f"{'dirty':11} {size[0]:4}x{size[1]:<4} {took * 1000:7.3f}ms per frame, "
+              f"{allocations} buffer allocations, {subsurfaces} subsurface pairs over {frames} frames")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Startup profile: time to import main.py (and through it the UI), build the Application and present the first frame
+of the login menu, each run in a fresh interpreter (cold imports),
+plus the slowest imports of main.py from python -X importtime.
+Also lists which heavy modules were imported before the first frame (they should be loaded lazily).
+Runs headless (SDL dummy video driver).
+usage: python -m benchmarks.bench_startup [runs]
+"""
+import time
+
+START = time.perf_counter()  # before anything else, the child run measures from here
+
+import json  # noqa: E402
+import os  # noqa: E402
+import subprocess  # noqa: E402
+import sys  # noqa: E402
+
+ASSETS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "assets")
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+LAZY = ["requests", "aiohttp", "websockets", "zMENU_msgs", "message_store"]
+
+
+def child():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import logging
+    import types
+
+    import main  # the real entry point, whatever it imports at module level counts
+    imported = time.perf_counter()
+
+    # only what Application reads, Settings() would look for (and create) a settings.json in the cwd
+    assetDir = os.path.abspath(ASSETS) + os.sep
+    settings = types.SimpleNamespace(ASSET_DIR=assetDir, DEBUG=False, LEVEL=logging.WARNING,
+                                     COMFORT=assetDir + "COMFORT.ttf", POPPINS=assetDir + "POPPINS.ttf")
+    app = main.Application(settings)  # noqa ; duck typed settings
+    built = time.perf_counter()
+
+    app.switch(0)
+    app.active.draw()
+    app.screen.present()
+    firstFrame = time.perf_counter()
+
+    print(json.dumps({
+        "importMs": (imported - START) * 1000,
+        "applicationMs": (built - imported) * 1000,
+        "firstMenuMs": (firstFrame - built) * 1000,
+        "firstFrameMs": (firstFrame - START) * 1000,
+        "loadedBeforeFirstFrame": [m for m in LAZY if m in sys.modules],
+    }))
+
+
+def slowestImports(count: int) -> list[tuple[str, float]]:
+    res = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=SRC, capture_output=True,
+                         text=True, env={**os.environ, "SDL_VIDEODRIVER": "dummy"})
+    out = []
+    for line in res.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        out.append((name.strip(), int(cumulative) / 1000))
+    out.sort(key=lambda x: x[1], reverse=True)
+    return out[:count]
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    results = []
+    for _ in range(runs):
+        res = subprocess.run([sys.executable, "-m", "benchmarks.bench_startup", "--child"], cwd=SRC,
+                             capture_output=True, text=True, check=True)
+        results.append(json.loads(res.stdout.strip().splitlines()[-1]))
+
+    for key in ("importMs", "applicationMs", "firstMenuMs", "firstFrameMs"):
+        values = sorted(r[key] for r in results)
+        print(f"{key:14} median {values[len(values) // 2]:8.1f}ms  min {values[0]:8.1f}ms  max {values[-1]:8.1f}ms")
+    print(f"loaded before the first frame: {results[-1]['loadedBeforeFirstFrame'] or 'none of ' + str(LAZY)}")
+
+    print("slowest imports of main (cumulative):")
+    for name, ms in slowestImports(15):
+        print(f"  {ms:8.1f}ms  {name}")
+
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        child()
+    else:
+        main()
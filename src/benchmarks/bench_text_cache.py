@@ -0,0 +1,44 @@
+"""
+Renders a screen full of chat text every frame, with render_to vs cached_render_to (GLOBAL_TextCache).
+Runs headless (SDL dummy video driver).
+usage: python -m benchmarks.bench_text_cache [frames]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame  # noqa: E402 ; the driver has to be set before pygame starts
+from libs import ui  # noqa: E402
+
+FONT = os.path.join(os.path.dirname(__file__), "..", "..", "assets", "COMFORT.ttf")
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    pygame.init()
+    surface = pygame.Surface((1080, 720), pygame.SRCALPHA)
+    font = ui.CUIFont(FONT, 16, ui.CUColor.WHITE())
+
+    lines = [f"user{i % 7}: this is chat message number {i}, with enough text to fill most of the row" for i in range(30)]
+
+    def frame(render):
+        surface.fill((43, 45, 49))
+        for i, line in enumerate(lines):
+            render(surface, (10, 10 + i * 24), line)
+
+    results = {}
+    for name, render in (("render_to", font.render_to), ("cached_render_to", font.cached_render_to)):
+        start = time.perf_counter()
+        for _ in range(frames):
+            frame(render)
+        results[name] = (time.perf_counter() - start) / frames
+
+    for name, took in results.items():
+        print(f"{name:18} {took * 1000:7.3f}ms per frame ({len(lines)} lines)")
+    print(f"speedup {results['render_to'] / results['cached_render_to']:.1f}x, cache: {ui.GLOBAL_TextCache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Wraps thousands of chat messages in a CUIVirtualList, then resizes it step by step (like dragging the window edge)
+and reports how many messages actually had to be re-wrapped per resize, then prepends pages of older messages.
+The default amount of messages is past the GLOBAL_TextLayout cache size.
+Runs headless (SDL dummy video driver).
+usage: python -m benchmarks.bench_text_layout [messages]
+"""
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame  # noqa: E402 ; the driver has to be set before pygame starts
+from libs import ui  # noqa: E402
+
+FONT = os.path.join(os.path.dirname(__file__), "..", "..", "assets", "COMFORT.ttf")
+WORDS = "the quick brown fox jumps over lazy dog chat message discord server channel reply link".split()
+
+
+class CountedTexts:
+    """
+    The getText of the list, counts how many items it had to look at.
+    """
+
+    def __init__(self, texts: list[str]):
+        self.texts = texts
+        self.calls = 0
+
+    def __call__(self, index: int) -> str:
+        self.calls += 1
+        return self.texts[index]
+
+
+def main():
+    layout = ui.GLOBAL_TextLayout
+    # past the layout cache on purpose, a pass over every message must not evict what the list relies on
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else layout.maxEntries + 10000
+    pygame.init()
+    rng = random.Random(1)
+    messages = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 120))) for _ in range(count)]
+    font = ui.CUIFont(FONT, 16, ui.CUColor.WHITE())
+    texts = CountedTexts(messages)
+    view = ui.CUIVirtualList(0, 0, 810, 680, ui.CUColor((49, 51, 56)), font, 20, texts,
+                             count=count, wrap=True)
+
+    start = time.perf_counter()
+    height = view.contentHeight
+    print(f"first layout of {count} messages: {(time.perf_counter() - start) * 1000:.1f}ms, {height:.0f}px tall")
+
+    for width in range(800, 500, -10):
+        calls = texts.calls
+        start = time.perf_counter()
+        view.resize(width, 680)
+        height = view.contentHeight
+        took = time.perf_counter() - start
+        print(f"width {width}: {took * 1000:6.2f}ms, re-wrapped {texts.calls - calls:5} "
+              f"of {count}, {height:.0f}px tall")
+
+    # half a pixel moves almost no line break, only the messages whose breaks sit on the edge are looked at
+    calls = texts.calls
+    view.resize(view.width + 0.5, 680)
+    print(f"width {view.width}: re-wrapped {texts.calls - calls} of {count}")
+
+    # scrolling up through history, a page of older messages is prepended at a time (like MsgsMenu.loadOlder)
+    page = 50
+    texts.texts = messages[-page:]
+    view.refresh()
+    view.set_count(page)
+    worst = 0.0
+    for shown in range(page * 2, count + 1, page):
+        texts.texts = messages[-shown:]
+        calls = texts.calls
+        start = time.perf_counter()
+        view.set_count(shown, added_front=page)
+        worst = max(worst, time.perf_counter() - start)
+        if texts.calls - calls > page:
+            print(f"prepend at {shown} messages looked at {texts.calls - calls} of them (expected {page})")
+    print(f"prepended {count // page} pages of {page}, slowest {worst * 1000:.2f}ms")
+
+    print(layout.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Frame time and allocations of representative libs/ui.py scenes, plus the scaling cost at several window sizes.
+Runs headless (SDL dummy video driver), results are also written as json so runs can be compared.
+usage: python -m benchmarks.bench_ui [frames] [--out results.json]
+"""
+import os
+import sys
+import json
+import platform
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame  # noqa: E402 ; the driver has to be set before pygame starts
+from libs import ui  # noqa: E402
+
+FONT = os.path.join(os.path.dirname(__file__), "..", "..", "assets", "COMFORT.ttf")
+LOGICAL = (1080, 720)
+WINDOW_SIZES = [(1080, 720), (1280, 720), (1920, 1080), (800, 600)]
+
+
+def _screen(size: tuple[int, int] = LOGICAL) -> ui.CScaleScreen:
+    screen = ui.CScaleScreen(size=LOGICAL)
+    if size != LOGICAL:
+        pygame.display.set_mode(size, pygame.RESIZABLE)
+        screen.surface = pygame.display.get_surface()
+    return screen
+
+
+def _key(char: str) -> pygame.Event:
+    return pygame.event.Event(pygame.KEYDOWN, key=ord(char), unicode=char, mod=0, scancode=0)
+
+
+def sceneLogin():
+    """
+    The login menu, typing one character per frame.
+    """
+    screen = _screen()
+    color = ui.CUColor((88, 101, 242)).darken(20, retColor=True)
+    font = ui.CUIFont(FONT, 20, ui.CUColor.WHITE())
+    title = ui.CUILabel(340, 200, ui.CUIFont(FONT, 30, ui.CUColor.WHITE()), "Login to Discord (NO 2FA)")
+    email = ui.CUITextInput(440, 350, 200, 75, color, font, "Email", onTextUpdate=lambda x: x, charLimit=100)
+    password = ui.CUITextInput(440, 450, 200, 75, color, font, "Password", onTextUpdate=lambda x: x, charLimit=100)
+    button = ui.CUITextButton(500, 550, 75, 25, color, font, "Login")
+    status = ui.CUILabel(440, 600, font, "")
+    objs = [title, email, password, button, status]
+    manager = ui.CUIManager([email, password, button])
+    for obj in objs:
+        obj.hasDrawn = True
+
+    email.isPressed = True  # focused, as if it was clicked
+    manager.focused = email
+    keys = [_key(c) for c in "someone@example.com"]
+    frame = 0
+
+    def run():
+        nonlocal frame
+        if len(email.text) >= 60:
+            email.text = ""  # through the widget, like a user clearing it
+        manager.tick([keys[frame % len(keys)]])
+        screen.redraw(objs, ui.CUColor((88, 101, 242)))
+        screen.present()
+        frame += 1
+
+    return run
+
+
+def sceneMessageList():
+    """
+    A 1k row message list, scrolled every frame.
+    """
+    screen = _screen()
+    lines = [f"user{i % 13}: message number {i}, long enough to look like a real chat line" for i in range(1000)]
+    view = ui.CUIVirtualList(250, 20, 810, 680, ui.CUColor((49, 51, 56)), ui.CUIFont(FONT, 16, ui.CUColor.WHITE()),
+                             24, lines.__getitem__, count=len(lines))
+    step = 37
+
+    def run():
+        nonlocal step
+        if view.scroll + step > view.maxScroll or view.scroll + step < 0:
+            step = -step
+        view.scroll_by(step)
+        screen.redraw([view], ui.CUColor((43, 45, 49)))
+        screen.present()
+
+    return run
+
+
+def sceneTextBlock():
+    """
+    10k glyphs of multiline text, redrawn every frame.
+    """
+    screen = _screen()
+    text = "\n".join(f"{i:03} the quick brown fox jumps over the lazy dog, pack my box with five dozen jug"[:80]
+                     for i in range(125))
+    label = ui.CUILabel(10, 10, ui.CUIFont(FONT, 10, ui.CUColor.WHITE()), text)
+
+    def run():
+        label.invalidate()
+        screen.redraw([label], ui.CUColor((43, 45, 49)))
+        screen.present()
+
+    return run
+
+
+def sceneManager():
+    """
+    CUIManager.tick with 5k buttons and a handful of mouse and key events per frame.
+    """
+    buttons = [ui.CUIButton(10 + (i % 100) * 10, 10 + (i // 100) * 14, 8, 12, ui.CUColor((88, 101, 242)))
+               for i in range(5000)]
+    for b in buttons:
+        b.hasDrawn = True
+    manager = ui.CUIManager(buttons)
+    events = [pygame.event.Event(pygame.MOUSEMOTION, pos=(0, 0), rel=(1, 0), buttons=(0, 0, 0))] * 10
+    events += [pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(0, 0), button=1), _key("a"), _key("b")]
+
+    def run():
+        manager.tick(events)
+
+    return run
+
+
+def _scaling(size: tuple[int, int]):
+    def scene():
+        screen = _screen(size)
+
+        def run():
+            screen.fill(ui.CUColor((43, 45, 49)))
+            screen.present()
+
+        return run
+
+    scene.__doc__ = f"A full present of the {LOGICAL[0]}x{LOGICAL[1]} surface into a {size[0]}x{size[1]} window."
+    return scene
+
+
+SCENES = {
+    "login": sceneLogin,
+    "messageList1k": sceneMessageList,
+    "textBlock10k": sceneTextBlock,
+    "manager5k": sceneManager,
+    **{f"scale{w}x{h}": _scaling((w, h)) for w, h in WINDOW_SIZES},
+}
+
+
+def measure(makeScene, frames: int) -> dict:
+    run = makeScene()
+    for _ in range(10):
+        run()  # warm up the caches
+
+    times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        run()
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+
+    # separate pass, tracemalloc slows everything down
+    allocFrames = max(frames // 10, 10)
+    tracemalloc.start()
+    peak = 0
+    for _ in range(allocFrames):
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        run()
+        peak += tracemalloc.get_traced_memory()[1] - current
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return {
+        "description": (makeScene.__doc__ or "").strip(),
+        "frames": frames,
+        "meanMs": sum(times) / len(times),
+        "p50Ms": times[int(0.50 * (len(times) - 1))],
+        "p99Ms": times[int(0.99 * (len(times) - 1))],
+        "maxMs": times[-1],
+        "allocPeakBytesPerFrame": peak / allocFrames,  # python heap only, SDL surfaces are not traced
+        "retainedBytes": retained,
+    }
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    frames = int(args[0]) if args and args[0].isdigit() else 300
+    out = sys.argv[sys.argv.index("--out") + 1] if "--out" in sys.argv else "bench_ui.json"
+
+    pygame.init()
+    results = {}
+    for name, makeScene in SCENES.items():
+        results[name] = measure(makeScene, frames)
+        r = results[name]
+        print(f"{name:16} mean {r['meanMs']:7.3f}ms  p50 {r['p50Ms']:7.3f}ms  p99 {r['p99Ms']:7.3f}ms  "
+              f"alloc {r['allocPeakBytesPerFrame'] / 1024:8.1f}KiB/frame")
+
+    with open(out, "w") as f:
+        json.dump({
+            "meta": {
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "pygame": pygame.version.ver,
+                "sdl": ".".join(map(str, pygame.get_sdl_version())),
+                "platform": platform.platform(),
+                "frames": frames,
+            },
+            "scenes": results,
+        }, f, indent=2)
+    print(f"results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
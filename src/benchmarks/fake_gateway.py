@@ -0,0 +1,116 @@
+"""
+A local stand-in for the Discord gateway, replays recorded dispatches to whoever connects.
+A recording is a jsonl file with one {"t": name, "d": data} dispatch per line.
+usage: python -m benchmarks.fake_gateway [recording.jsonl] [port]
+"""
+import asyncio
+import json
+import sys
+import zlib
+import websockets
+
+
+def syntheticRecording(count: int = 10000) -> list[dict]:
+    """
+    Creates a fake recording full of MESSAGE_CREATE dispatches (roughly the size of real ones).
+    """
+    out = []
+    for i in range(count):
+        out.append({"t": "MESSAGE_CREATE", "d": {
+            "id": str(1200000000000000000 + i),
+            "channel_id": str(1100000000000000000 + i % 20),
+            "guild_id": "1000000000000000000",
+            "author": {"id": str(900000000000000000 + i % 50), "username": f"user{i % 50}", "avatar": None,
+                       "discriminator": "0", "global_name": f"User {i % 50}"},
+            "content": f"message number {i} " + "lorem ipsum dolor sit amet " * (i % 6),
+            "timestamp": "2024-01-01T00:00:00.000000+00:00",
+            "edited_timestamp": None, "tts": False, "mention_everyone": False, "mentions": [],
+            "mention_roles": [], "attachments": [], "embeds": [], "pinned": False, "type": 0,
+        }})
+    return out
+
+
+def loadRecording(path: str) -> list[dict]:
+    with open(path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class FakeGateway:
+    """
+    Replays a recording to every client that identifies (or resumes).
+    :param list[dict] recording: The dispatches to send, in order.
+    :param float heartbeatInterval: The heartbeat interval (seconds) sent in HELLO.
+    """
+
+    def __init__(self, recording: list[dict], heartbeatInterval: float = 41.25):
+        self.recording = recording
+        self.heartbeatInterval = heartbeatInterval
+        self.server = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Starts listening.
+        :return: The url to give to GatewayClient.
+        """
+        self.server = await websockets.serve(self._handler, host, port, max_size=None, compression=None)
+        port = self.server.sockets[0].getsockname()[1]
+        return f"ws://{host}:{port}/"
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handler(self, ws, *_):
+        compress = "compress=zlib-stream" in self._path(ws)
+        deflator = zlib.compressobj() if compress else None
+
+        async def send(payload: dict):
+            data = json.dumps(payload, separators=(",", ":"))
+            if deflator is not None:
+                await ws.send(deflator.compress(data.encode("utf-8")) + deflator.flush(zlib.Z_SYNC_FLUSH))
+            else:
+                await ws.send(data)
+
+        await send({"op": 10, "d": {"heartbeat_interval": int(self.heartbeatInterval * 1000)}})
+
+        replay = None
+        try:
+            async for msg in ws:
+                payload = json.loads(msg)
+                if payload["op"] == 1:
+                    await send({"op": 11, "d": None})
+                elif payload["op"] in (2, 6) and replay is None:
+                    replay = asyncio.create_task(self._replay(send, resumed=payload["op"] == 6))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            if replay is not None:
+                replay.cancel()
+
+    async def _replay(self, send, resumed: bool):
+        seq = 1
+        if resumed:
+            await send({"op": 0, "s": seq, "t": "RESUMED", "d": {}})
+        else:
+            await send({"op": 0, "s": seq, "t": "READY", "d": {
+                "session_id": "fake", "resume_gateway_url": None, "user": {"id": "1", "username": "bench"}}})
+
+        for dispatch in self.recording:
+            seq += 1
+            await send({"op": 0, "s": seq, "t": dispatch["t"], "d": dispatch["d"]})
+
+    @staticmethod
+    def _path(ws) -> str:
+        request = getattr(ws, "request", None)  # websockets >= 13
+        return request.path if request is not None else getattr(ws, "path", "")
+
+
+async def _serveForever(recording: list[dict], port: int):
+    gateway = FakeGateway(recording)
+    print(f"fake gateway on {await gateway.start(port=port)}")
+    await asyncio.Future()
+
+
+if __name__ == "__main__":
+    rec = loadRecording(sys.argv[1]) if len(sys.argv) > 1 else syntheticRecording()
+    asyncio.run(_serveForever(rec, int(sys.argv[2]) if len(sys.argv) > 2 else 0))
@@ -0,0 +1,237 @@
+"""
+This file handles the websocket (gateway) connection to Discord.
+The gateway runs on its own thread (with its own asyncio loop), every dispatch is pushed onto the events system
+so the render thread never waits on the socket.
+"""
+import asyncio
+import json
+import logging
+import random
+import threading
+import zlib
+from libs import events as ev
+from libs.logger import LoggingBase
+
+GATEWAY_URL = "wss://gateway.discord.gg"
+GATEWAY_QUERY = "?v=9&encoding=json&compress=zlib-stream"
+ZLIB_SUFFIX = b"\x00\x00\xff\xff"
+# close codes that reconnecting can not fix: authentication failed, invalid shard, sharding required,
+# invalid api version, invalid intents, disallowed intents
+FATAL_CLOSE_CODES = {4004, 4010, 4011, 4012, 4013, 4014}
+
+
+class OP:
+    """
+    Gateway opcodes
+    """
+    DISPATCH = 0
+    HEARTBEAT = 1
+    IDENTIFY = 2
+    RESUME = 6
+    RECONNECT = 7
+    INVALID_SESSION = 9
+    HELLO = 10
+    HEARTBEAT_ACK = 11
+
+
+class ZlibStreamDecoder:
+    """
+    Decompresses the zlib-stream transport.
+    The whole connection is one zlib stream, a message is complete once a frame ends with the Z_SYNC_FLUSH suffix.
+    WARN: One decoder per connection, the stream state can not be shared or reused after a reconnect.
+    """
+
+    def __init__(self):
+        self._inflator = zlib.decompressobj()
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> str | None:
+        """
+        Feed a websocket frame.
+        :param bytes data: The raw frame.
+        :return: The decoded message, or None if the message continues in the next frame.
+        """
+        if len(data) >= 4 and data[-4:] == ZLIB_SUFFIX and not self._buffer:
+            # fast path, most messages are a single frame
+            return self._inflator.decompress(data).decode("utf-8")
+
+        self._buffer.extend(data)
+        if len(self._buffer) < 4 or self._buffer[-4:] != ZLIB_SUFFIX:
+            return None
+
+        msg = self._inflator.decompress(self._buffer).decode("utf-8")
+        self._buffer.clear()
+        return msg
+
+
+class GatewayClient(LoggingBase):
+    """
+    A Discord gateway connection, handles heartbeats, IDENTIFY/RESUME and reconnects.
+    :param str token: The user token.
+    :param str url: The gateway url (without the query, optional defaults to GATEWAY_URL).
+    :param bool compress: Whether to use zlib-stream transport compression.
+    :param Callable onDispatch: Called with (name, data) for every dispatch, from the gateway thread!
+                                (optional defaults to pushing a GatewayDispatchEvent)
+    :param int level: The logging level.
+    """
+
+    def __init__(self, token: str, url: str = GATEWAY_URL, compress: bool = True, onDispatch=None,
+                 level: int = logging.INFO):
+        super().__init__(level)
+        self.token = token
+        self.url = url
+        self.compress = compress
+        self.onDispatch = onDispatch if onDispatch is not None else self._pushDispatch
+
+        self.sequence: int | None = None
+        self.sessionId: str | None = None
+        self.resumeUrl: str | None = None
+
+        self.heartbeatInterval = 41.25
+        self.acked = True
+        self.dispatchCount = 0  # read by benchmarks, only written by the gateway thread
+
+        self._ws = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._running = False
+
+    @staticmethod
+    def _pushDispatch(name: str, data):
+        ev.pushEvent(ev.GatewayDispatchEvent(name, data))
+
+    def start(self) -> threading.Thread:
+        """
+        Starts the connection on a daemon thread.
+        :return: The thread.
+        """
+        self._running = True
+        self._thread = threading.Thread(target=asyncio.run, args=(self._run(),), daemon=True, name="gateway")
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        """
+        Closes the connection (thread-safe), the session is forgotten.
+        """
+        self._running = False
+        self.sessionId = None
+        self.sequence = None
+        self.resumeUrl = None
+        if self._loop is not None and self._ws is not None:
+            asyncio.run_coroutine_threadsafe(self._ws.close(1000), self._loop)
+
+    async def _run(self):
+        import websockets  # only needed once logged in, kept out of the startup imports
+
+        self._loop = asyncio.get_running_loop()
+        backoff = 1
+
+        while self._running:
+            url = (self.resumeUrl if self.sessionId and self.resumeUrl else self.url)
+            url += GATEWAY_QUERY if self.compress else GATEWAY_QUERY.replace("&compress=zlib-stream", "")
+
+            ws = None
+            dispatches = self.dispatchCount
+            try:
+                async with websockets.connect(url, max_size=None, compression=None) as ws:
+                    self._ws = ws
+                    await self._receive(ws)
+            except (OSError, websockets.WebSocketException) as e:
+                self.logger.warning(f"gateway connection lost ({e!r})")
+            except Exception:  # a malformed payload (json, missing keys, zlib) must not kill the thread
+                self.logger.exception("gateway error")
+            finally:
+                self._ws = None
+
+            if ws is not None and ws.close_code in FATAL_CLOSE_CODES:
+                self.logger.error(f"gateway closed with {ws.close_code} ({ws.close_reason}), not reconnecting")
+                self._running = False
+                ev.pushEvent(ev.GatewayClosedEvent(ws.close_code, ws.close_reason))
+                return
+
+            if self.dispatchCount != dispatches:
+                backoff = 1  # the session worked, only connections that never got anywhere back off further
+
+            # every close goes through the backoff (a server closing right away with 1000 included)
+            if self._running:
+                self.logger.info(f"reconnecting to the gateway in {backoff}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+
+    async def _receive(self, ws):
+        decoder = ZlibStreamDecoder() if self.compress else None
+        heartbeat = None
+
+        try:
+            async for frame in ws:
+                if decoder is not None and isinstance(frame, bytes):
+                    frame = decoder.feed(frame)
+                    if frame is None:
+                        continue
+
+                payload = json.loads(frame)
+                op = payload["op"]
+
+                if op == OP.DISPATCH:
+                    self.sequence = payload["s"]
+                    name = payload["t"]
+                    if name == "READY":
+                        self.sessionId = payload["d"]["session_id"]
+                        self.resumeUrl = payload["d"].get("resume_gateway_url")
+
+                    self.dispatchCount += 1
+                    self.onDispatch(name, payload["d"])
+
+                elif op == OP.HEARTBEAT_ACK:
+                    self.acked = True
+
+                elif op == OP.HEARTBEAT:
+                    await self._send(ws, OP.HEARTBEAT, self.sequence)
+
+                elif op == OP.HELLO:
+                    self.heartbeatInterval = payload["d"]["heartbeat_interval"] / 1000
+                    self.acked = True
+                    heartbeat = asyncio.create_task(self._heartbeat(ws))
+                    await self._identify(ws)
+
+                elif op == OP.RECONNECT:
+                    self.logger.info("gateway asked us to reconnect")
+                    await ws.close(4000)  # anything other than 1000/1001 keeps the session alive
+
+                elif op == OP.INVALID_SESSION:
+                    if not payload["d"]:  # d is whether the session can be resumed
+                        self.sessionId = None
+                        self.sequence = None
+                    await asyncio.sleep(random.uniform(1, 5))
+                    await self._identify(ws)
+        finally:
+            if heartbeat is not None:
+                heartbeat.cancel()
+
+    async def _identify(self, ws):
+        if self.sessionId is not None:
+            await self._send(ws, OP.RESUME, {"token": self.token, "session_id": self.sessionId, "seq": self.sequence})
+            return
+
+        await self._send(ws, OP.IDENTIFY, {
+            "token": self.token,
+            "properties": {"os": "Windows", "browser": "Discord Client", "device": ""},
+            "compress": False,  # payload compression, we use transport compression instead
+        })
+
+    async def _heartbeat(self, ws):
+        await asyncio.sleep(self.heartbeatInterval * random.random())  # jitter, as asked by the docs
+        while True:
+            if not self.acked:
+                self.logger.warning("no heartbeat ack, zombied connection")
+                await ws.close(4000)
+                return
+
+            self.acked = False
+            await self._send(ws, OP.HEARTBEAT, self.sequence)
+            await asyncio.sleep(self.heartbeatInterval)
+
+    @staticmethod
+    async def _send(ws, op: int, data):
+        await ws.send(json.dumps({"op": op, "d": data}))
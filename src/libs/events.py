@@ -1,22 +1,50 @@
 """
 Events system for events to travel throughout the application
-While a layer design is ideal here, for speed/simplicity purposes we skip this and just give everyone all events.
-(^ this means that events cannot be "eaten" or destroyed, all layers access everything.)
+Every event is routed (by its class, or its type for events that can go to either side) into a lane,
+each consumer thread only ever touches its own lane:
+    RENDER  <- type % 5 == 1 (the render thread and its menus)
+    BACKEND <- type % 5 == 2 (nonVisualCode)
+    WORKER  <- everything else (saved for other threads)
+Consumers take events out of their lane with popEvents (non-blocking) or waitEvents (sleeps until something is pushed).
+Events a consumer does not want to deal with can be handed back with returnEvents.
+Consumers handle events through a Dispatcher (handlers looked up by event class) rather than checking type codes.
+Events use __slots__, every subclass MUST declare its own __slots__ (otherwise it silently gets a __dict__ again).
+
+Optional instrumentation (queue depth, dwell time, per-type counters) is turned on with enableStats,
+while it is off the only cost is one `is None` check per push/pop.
 
 This file works by essentially making EventList into a singleton that is declared using the init call.
 """
+import bisect
+import collections
+import logging
+import threading
+import time
+from typing import Callable
 
 GLOBAL_EventList = None
+GLOBAL_EventStats = None
+
+RENDER = 1
+BACKEND = 2
+WORKER = 3
+
+_TYPE_LANES = (WORKER, RENDER, BACKEND, WORKER, WORKER)  # indexed by type % 5
 
 
 class Event:
+    __slots__ = ("type", "pushedAt")  # pushedAt is only set while stats are enabled
+    LANE: int | None = None  # set on subclasses that always go to the same lane, otherwise it comes from the type
+
     def __init__(self, eventType: int):
-        self.__dict__ = {}  # reset everything yk
         self.type = eventType
 
+    @property
+    def lane(self) -> int:
+        return self.LANE if self.LANE is not None else _TYPE_LANES[self.type % 5]
+
 
-# TODO: (random idea) make all even events for the renderer, and all odd for the other?
-# example:
+# example of the type numbering:
 #   type_1 <- render related event
 #   type_2 <- non visual related event
 #   type_3 <- saved for other threads event (these are there when the non visual makes a new thread and needs to communicate with it)
@@ -25,19 +53,183 @@ class Event:
 #   now the system repeats (you can probably use a modulus call like `if event.type % 5 == 1: print("its render!")`
 #   type_6 <- back to render related event (different code but render still care about)
 
+
+class Lane:
+    """
+    A thread-safe queue of events for one consumer.
+    """
+
+    def __init__(self):
+        self.queue: collections.deque[Event] = collections.deque()
+        self.condition = threading.Condition()  # guards queue, notified on every push
+        self.wakeHook: Callable[[], None] | None = None  # for consumers that sleep on something else than the lane
+
+    def push(self, x: Event):
+        with self.condition:
+            self.queue.append(x)
+            self.condition.notify_all()
+        if self.wakeHook is not None:
+            self.wakeHook()
+
+    def pushFront(self, events: list[Event]):
+        with self.condition:
+            self.queue.extendleft(reversed(events))
+            self.condition.notify_all()
+
+    def depth(self) -> int:
+        return len(self.queue)
+
+    def pop(self) -> list[Event]:
+        with self.condition:
+            events = list(self.queue)
+            self.queue.clear()
+            return events
+
+    def wait(self, timeout: float = None) -> list[Event]:
+        with self.condition:
+            if not self.queue:
+                self.condition.wait(timeout)
+
+            events = list(self.queue)
+            self.queue.clear()
+            return events
+
+
+class Dispatcher:
+    """
+    Calls the handler registered for the class of an event, one dict lookup per event.
+    Usage:
+        dispatcher = Dispatcher()
+        dispatcher.register(TokenDataEvent, onToken)
+        dispatcher.dispatchAll(popEvents(RENDER))
+    WARN: Matches the exact class, a subclass needs its own handler.
+    """
+
+    def __init__(self):
+        self.handlers: dict[type, Callable[[Event], None]] = {}
+
+    def register(self, eventClass: type, handler: Callable[[Event], None]):
+        self.handlers[eventClass] = handler
+
+    def unregister(self, eventClass: type):
+        self.handlers.pop(eventClass, None)
+
+    def dispatch(self, x: Event) -> bool:
+        """
+        :return: Whether a handler existed for the event.
+        """
+        handler = self.handlers.get(x.__class__)
+        if handler is None:
+            return False
+
+        handler(x)
+        return True
+
+    def dispatchAll(self, events: list[Event]) -> list[Event]:
+        """
+        Dispatches every event in order.
+        :return: The events that had no handler.
+        """
+        handlers = self.handlers
+        unhandled = []
+        for x in events:
+            handler = handlers.get(x.__class__)
+            if handler is None:
+                unhandled.append(x)
+            else:
+                handler(x)
+        return unhandled
+
+
 class EventList:
     def __init__(self):
         if GLOBAL_EventList is not None:
             raise ValueError("Only one EventList is allowed! (init declaration!)")
-        self.__events__ = []
+        self.lanes: dict[int, Lane] = {RENDER: Lane(), BACKEND: Lane(), WORKER: Lane()}
 
-    @property
-    def events(self):
-        return self.__events__
+    def push(self, x: Event):
+        self.lanes[x.lane].push(x)
+
+
+class EventStats:
+    """
+    Counters and dwell time (push -> pop) histograms for the events system.
+    Do not create this yourself, use enableStats/getStats/dumpStats.
+    """
+    # histogram bucket edges in milliseconds, the last bucket is everything above the last edge
+    EDGES = (0.01, 0.1, 1, 5, 10, 50, 100, 500, 1000)
+    CONSUMED = -1.0  # pushedAt of an event that was already counted (it was handed back with returnEvents)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.pushed: collections.Counter[str] = collections.Counter()
+        self.consumed: collections.Counter[str] = collections.Counter()
+        self.returned: collections.Counter[str] = collections.Counter()
+        self.depthHigh: dict[int, int] = {RENDER: 0, BACKEND: 0, WORKER: 0}
+        self.dwell: dict[str, list[int]] = {}  # type name -> bucket counts
+        self.dwellMax: dict[str, float] = {}
+        self.dwellTotal: dict[str, float] = {}
+
+    def onPush(self, x: Event, depth: int):
+        x.pushedAt = time.perf_counter()
+        with self._lock:
+            self.pushed[x.__class__.__name__] += 1
+            if depth > self.depthHigh[x.lane]:
+                self.depthHigh[x.lane] = depth
+
+    def onConsume(self, events: list[Event]):
+        now = time.perf_counter()
+        with self._lock:
+            for x in events:
+                pushedAt = getattr(x, "pushedAt", None)
+                if pushedAt == self.CONSUMED:  # popped again after a returnEvents, only the first pop counts
+                    continue
+
+                name = x.__class__.__name__
+                self.consumed[name] += 1
+                x.pushedAt = self.CONSUMED
+                if pushedAt is None:  # pushed before the stats were enabled
+                    continue
+
+                ms = (now - pushedAt) * 1000
+                if name not in self.dwell:
+                    self.dwell[name] = [0] * (len(self.EDGES) + 1)
+                    self.dwellMax[name] = 0.0
+                    self.dwellTotal[name] = 0.0
+                self.dwell[name][bisect.bisect_left(self.EDGES, ms)] += 1
+                self.dwellTotal[name] += ms
+                if ms > self.dwellMax[name]:
+                    self.dwellMax[name] = ms
 
-    @events.setter
-    def events(self, x: Event):
-        self.__events__.append(x)
+    def onReturn(self, events: list[Event]):
+        with self._lock:
+            for x in events:
+                self.returned[x.__class__.__name__] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            elapsed = max(time.monotonic() - self.started, 1e-9)
+            types = {}
+            for name in set(self.pushed) | set(self.consumed):
+                consumed = self.consumed[name]
+                types[name] = {
+                    "pushed": self.pushed[name],
+                    "consumed": consumed,
+                    "returned": self.returned[name],
+                    "pushedPerSec": self.pushed[name] / elapsed,
+                    "dwellHistogram": list(self.dwell.get(name, [])),
+                    "dwellMeanMs": self.dwellTotal.get(name, 0.0) / consumed if consumed else 0.0,
+                    "dwellMaxMs": self.dwellMax.get(name, 0.0),
+                }
+
+            return {
+                "seconds": elapsed,
+                "histogramEdgesMs": list(self.EDGES),
+                "depthHighWater": {"RENDER": self.depthHigh[RENDER], "BACKEND": self.depthHigh[BACKEND],
+                                   "WORKER": self.depthHigh[WORKER]},
+                "types": types
+            }
 
 
 def init():
@@ -45,17 +237,106 @@ def init():
     GLOBAL_EventList = EventList()
 
 
-def getEvents():
-    return GLOBAL_EventList.events  # noqa ; we shall believe
+def enableStats():
+    """
+    Starts recording event stats (resets them if they were already on).
+    """
+    global GLOBAL_EventStats
+    GLOBAL_EventStats = EventStats()
 
 
-def removeEvent(x: Event):
-    global GLOBAL_EventList
-    GLOBAL_EventList.__events__.remove(x)  # noqa ; we shall believe
+def disableStats():
+    global GLOBAL_EventStats
+    GLOBAL_EventStats = None
+
+
+def getStats() -> dict | None:
+    """
+    :return: A snapshot of the stats, or None if they are not enabled.
+    """
+    stats = GLOBAL_EventStats
+    return stats.snapshot() if stats is not None else None
+
+
+def dumpStats(logger: logging.Logger = None):
+    """
+    Logs the current stats (one line per lane/type).
+    :param logging.Logger logger: The logger to use (optional defaults to an "EventStats" logger from libs.logger).
+    """
+    snap = getStats()
+    if logger is None:
+        from libs.logger import setupLogging  # only needed here, logger is otherwise independent of events
+        logger = logging.getLogger("EventStats")
+        if not logger.handlers:
+            logger = setupLogging("EventStats")
+
+    if snap is None:
+        logger.info("event stats are not enabled (ev.enableStats())")
+        return
+
+    logger.info(f"event stats over {snap['seconds']:.1f}s, queue depth high-water: {snap['depthHighWater']}")
+    for name, t in sorted(snap["types"].items()):
+        logger.info(f"{name}: pushed {t['pushed']} ({t['pushedPerSec']:.1f}/s) consumed {t['consumed']} "
+                    f"returned {t['returned']} dwell mean {t['dwellMeanMs']:.3f}ms max {t['dwellMaxMs']:.3f}ms "
+                    f"histogram {t['dwellHistogram']}")
 
 
 def pushEvent(x: Event):
-    GLOBAL_EventList.events = x
+    stats = GLOBAL_EventStats
+    if stats is not None:
+        stats.onPush(x, GLOBAL_EventList.lanes[x.lane].depth() + 1)  # noqa
+    GLOBAL_EventList.push(x)  # noqa ; we shall believe
+
+
+def popEvents(lane: int) -> list[Event]:
+    """
+    Takes every event currently waiting in a lane (does not block).
+    :param int lane: RENDER, BACKEND or WORKER.
+    :return: The events in the order they were pushed.
+    """
+    events = GLOBAL_EventList.lanes[lane].pop()  # noqa
+    stats = GLOBAL_EventStats  # read once, disableStats may run on another thread
+    if stats is not None and events:
+        stats.onConsume(events)
+    return events
+
+
+def waitEvents(lane: int, timeout: float = None) -> list[Event]:
+    """
+    Same as popEvents, but sleeps until an event is pushed into the lane (or the timeout runs out).
+    :param int lane: RENDER, BACKEND or WORKER.
+    :param float timeout: The maximum seconds to wait, None waits forever.
+    :return: The events in the order they were pushed (empty if timed out).
+    """
+    events = GLOBAL_EventList.lanes[lane].wait(timeout)  # noqa
+    stats = GLOBAL_EventStats  # read once, disableStats may run on another thread
+    if stats is not None and events:
+        stats.onConsume(events)
+    return events
+
+
+def setWakeHook(lane: int, hook: Callable[[], None] | None):
+    """
+    Calls hook (from the pushing thread) after every push into a lane.
+    ex: the render thread sleeps in pygame.event.wait, not on its lane, so it needs a pygame event to wake up.
+    :param int lane: RENDER, BACKEND or WORKER.
+    :param Callable hook: The function to call, None removes it.
+    """
+    GLOBAL_EventList.lanes[lane].wakeHook = hook  # noqa
+
+
+def returnEvents(lane: int, events: list[Event]):
+    """
+    Puts events back at the front of a lane, for events a consumer took but wants someone else to handle.
+    ex: a menu handing a TransitionMenuEvent back to the Application.
+    :param int lane: The lane the events came from.
+    :param list[Event] events: The events, in their original order.
+    """
+    if events:
+        stats = GLOBAL_EventStats
+        if stats is not None:
+            stats.onReturn(events)
+        GLOBAL_EventList.lanes[lane].pushFront(events)  # noqa
 
 
 # event definitions
@@ -65,11 +346,17 @@ class RequestToken(Event):
     """
     Requesting the token from the backend,
     """
+    __slots__ = ()
+    LANE = BACKEND
+
     def __init__(self):
         super().__init__(7)  # backend event!
 
 
 class LoginEvent(Event):
+    __slots__ = ("user", "passw")
+    LANE = BACKEND
+
     def __init__(self, user, passw):
         super().__init__(12)
         self.user = user
@@ -80,6 +367,8 @@ class TokenDataEvent(Event):
     """
     This event is sent whenever we need to transfer token data to either side
     """
+    __slots__ = ("token",)
+
     def __init__(self, t: int, token: str):
         if t not in [1, 2, 3, 4, 5]:
             raise ValueError("Must be 1 - 5 event!")
@@ -91,6 +380,87 @@ class TransitionMenuEvent(Event):
     """
     Transition to another menu, a menu will ignore this and instead kill itself and save it for the primary renderer.
     """
+    __slots__ = ("goto",)
+    LANE = RENDER
+
     def __init__(self, MenuNum: int):
         super().__init__(6)  # renderer event!
         self.goto = MenuNum
+
+
+class GatewayDispatchEvent(Event):
+    """
+    A dispatch (op 0) from the gateway, name is the dispatch name (ex: MESSAGE_CREATE) and data its payload.
+    """
+    __slots__ = ("name", "data")
+    LANE = BACKEND
+
+    def __init__(self, name: str, data):
+        super().__init__(17)  # backend event!
+        self.name = name
+        self.data = data
+
+
+class TaskResultEvent(Event):
+    """
+    Sent by libs.worker when a submitted task finishes, into the lane of whoever submitted it.
+    task is the libs.worker.Task, result its return value and error the exception it raised (or None).
+    cancelled is True when the task never ran (ex: the pool shut down), error is then a CancelledError.
+    """
+    __slots__ = ("task", "result", "error", "cancelled")
+
+    def __init__(self, lane: int, task, result=None, error: BaseException = None, cancelled: bool = False):
+        super().__init__(20 + lane)  # 21 -> render, 22 -> backend, 23 -> worker
+        self.task = task
+        self.result = result
+        self.error = error
+        self.cancelled = cancelled
+
+
+class RequestChannels(Event):
+    """
+    Requesting the channel list from the backend, it answers with a ChannelListEvent.
+    """
+    __slots__ = ()
+    LANE = BACKEND
+
+    def __init__(self):
+        super().__init__(27)  # backend event!
+
+
+class ChannelListEvent(Event):
+    """
+    The channels we can read, channels is a list of (channel id, display name).
+    """
+    __slots__ = ("channels",)
+    LANE = RENDER
+
+    def __init__(self, channels: list[tuple[str, str]]):
+        super().__init__(26)  # renderer event!
+        self.channels = channels
+
+
+class MessageCreatedEvent(Event):
+    """
+    A new message (from the gateway) for the render thread, already added to the message store.
+    """
+    __slots__ = ("channelId", "message")
+    LANE = RENDER
+
+    def __init__(self, channelId: str, message: dict):
+        super().__init__(31)  # renderer event!
+        self.channelId = channelId
+        self.message = message
+
+
+class GatewayClosedEvent(Event):
+    """
+    The gateway was closed for good (ex: authentication failed), code and reason are the websocket close frame.
+    """
+    __slots__ = ("code", "reason")
+    LANE = BACKEND
+
+    def __init__(self, code: int, reason: str):
+        super().__init__(32)  # backend event!
+        self.code = code
+        self.reason = reason
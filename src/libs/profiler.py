@@ -0,0 +1,168 @@
+"""
+Frame profiler, records how long every phase of a frame (events, tick, draw, scale, flip) and every widget draw took.
+Off by default and free while off: every call site only checks profiler.ACTIVE.
+In the UI, F3 toggles it (with an overlay) and Shift+F3 writes a trace (see CUIFrameScheduler),
+the trace uses the Chrome trace event format, open it with chrome://tracing or https://ui.perfetto.dev.
+"""
+import collections
+import json
+import time
+
+PHASES = ("events", "tick", "draw", "scale", "flip")
+
+
+class FrameRecord:
+    """
+    The timings of one frame, every time is a time.perf_counter() value (seconds).
+    """
+    __slots__ = ("start", "end", "menu", "phases", "widgets")
+
+    def __init__(self, start: float, menu: str):
+        self.start = start
+        self.end = start
+        self.menu = menu
+        self.phases: list[tuple[str, float, float]] = []  # (name, start, duration)
+        self.widgets: list[tuple[str, float, float]] = []  # (name, start, duration)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class Profiler:
+    """
+    Keeps the last frames in a ring buffer.
+    Usage:
+        prof = profiler.ACTIVE
+        if prof is not None:
+            start = time.perf_counter()
+        ...
+        if prof is not None:
+            prof.record("draw", start, time.perf_counter())
+    WARN: Only meant for the render thread, nothing is locked.
+    :param int frames: The amount of frames to keep.
+    """
+
+    def __init__(self, frames: int = 600):
+        self.records: collections.deque[FrameRecord] = collections.deque(maxlen=frames)
+        self.current: FrameRecord | None = None
+
+    def begin_frame(self, menu: str = "") -> None:
+        """
+        Ends the current frame (if any) and starts a new one.
+        :param str menu: The menu drawing the frame, kept in the trace.
+        """
+        now = time.perf_counter()
+        if self.current is not None:
+            self.current.end = now
+            self.records.append(self.current)
+        self.current = FrameRecord(now, menu)
+
+    def end_frame(self) -> None:
+        """
+        Ends the current frame without starting a new one (ex: before sleeping, so idle time is not counted).
+        """
+        if self.current is not None:
+            self.current.end = time.perf_counter()
+            self.records.append(self.current)
+            self.current = None
+
+    def record(self, phase: str, start: float, end: float) -> None:
+        if self.current is not None:
+            self.current.phases.append((phase, start, end - start))
+
+    def record_widget(self, name: str, start: float, end: float) -> None:
+        if self.current is not None:
+            self.current.widgets.append((name, start, end - start))
+
+    def frame_times(self) -> list[float]:
+        """
+        :return: The frame times in milliseconds, oldest first.
+        """
+        return [r.duration * 1000 for r in self.records]
+
+    def summary(self, slowest: int = 5) -> dict:
+        """
+        :param int slowest: The amount of widgets to list.
+        :return: Frame time percentiles, mean time per phase and the slowest widgets (in milliseconds).
+        """
+        times = sorted(self.frame_times())
+        if not times:
+            return {"frames": 0, "p50Ms": 0.0, "p99Ms": 0.0, "maxMs": 0.0, "phasesMs": {}, "slowestWidgets": []}
+
+        phases = collections.Counter()
+        widgetTotal = collections.Counter()
+        widgetMax: dict[str, float] = {}
+        for r in self.records:
+            for name, _, duration in r.phases:
+                phases[name] += duration
+            for name, _, duration in r.widgets:
+                widgetTotal[name] += duration
+                widgetMax[name] = max(widgetMax.get(name, 0.0), duration)
+
+        frames = len(self.records)
+        return {
+            "frames": frames,
+            "p50Ms": times[int(0.50 * (len(times) - 1))],
+            "p99Ms": times[int(0.99 * (len(times) - 1))],
+            "maxMs": times[-1],
+            "phasesMs": {name: total * 1000 / frames for name, total in phases.items()},
+            "slowestWidgets": [{"name": name, "meanMs": total * 1000 / frames, "maxMs": widgetMax[name] * 1000}
+                               for name, total in widgetTotal.most_common(slowest)],
+        }
+
+    def export_trace(self, path: str) -> str:
+        """
+        Writes the recorded frames as a Chrome trace (frames, their phases and widget draws as nested slices).
+        :param str path: The file to write.
+        :return: The path.
+        """
+        if not self.records:
+            events = []
+        else:
+            origin = self.records[0].start
+
+            def slice_(name: str, cat: str, start: float, duration: float, args: dict = None) -> dict:
+                x = {"name": name, "cat": cat, "ph": "X", "pid": 1, "tid": 1,
+                     "ts": (start - origin) * 1e6, "dur": duration * 1e6}
+                if args:
+                    x["args"] = args
+                return x
+
+            events = []
+            for r in self.records:
+                events.append(slice_("frame", "frame", r.start, r.duration, {"menu": r.menu}))
+                events.extend(slice_(name, "phase", start, duration) for name, start, duration in r.phases)
+                events.extend(slice_(name, "widget", start, duration) for name, start, duration in r.widgets)
+
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+        return path
+
+
+ACTIVE: Profiler | None = None  # None while profiling is off, call sites check this and nothing else
+
+
+def enable(frames: int = 600) -> Profiler:
+    global ACTIVE
+    if ACTIVE is None:
+        ACTIVE = Profiler(frames)
+    return ACTIVE
+
+
+def disable() -> None:
+    global ACTIVE
+    ACTIVE = None
+
+
+def toggle() -> bool:
+    """
+    :return: Whether profiling is now on.
+    """
+    if ACTIVE is None:
+        enable()
+        return True
+
+    disable()
+    return False
@@ -0,0 +1,209 @@
+"""
+Rate limit tracking for the Discord REST api.
+Discord limits requests per bucket (a route + its major parameter), and on top of that has a global limit.
+This file keeps the state of every bucket and tells the caller how long to wait before sending a request,
+it never sleeps itself so both the blocking and the asyncio client can share the same rules.
+"""
+import re
+import threading
+import time
+
+# major parameters, requests to different channels/guilds/webhooks are in different buckets.
+MAJOR_PARAM = re.compile(r"^/(channels|guilds|webhooks)/(\d+)(?:/([^/?]+))?")
+SNOWFLAKE = re.compile(r"\d{15,}")
+
+GLOBAL_LIMIT = 50  # requests per second, for any bot/user
+UNKNOWN_WAIT = 0.05  # how long to wait for the first request of a new bucket to come back
+
+
+def routeKey(method: str, route: str) -> str:
+    """
+    Creates the key of the bucket a request belongs to.
+    Every snowflake is replaced by a placeholder, except the major parameter.
+    ex: ("GET", "/channels/123.../messages/456...") -> "GET /channels/123.../messages/{id}"
+    WARN: Only works with snowflakes (15+ digits), short test ids will be kept as-is.
+    :param str method: The http method.
+    :param str route: The route (without the version).
+    :return str: The key.
+    """
+    route = route.split("?", 1)[0]
+    match = MAJOR_PARAM.match(route)
+    if match:
+        end = match.end(2)
+        if match.group(1) == "webhooks" and match.group(3) is not None:
+            end = match.end(3)  # the webhook token is part of the major param
+        return f"{method} {route[:end]}{SNOWFLAKE.sub('{id}', route[end:])}"
+
+    return f"{method} {SNOWFLAKE.sub('{id}', route)}"
+
+
+class Bucket:
+    """
+    The state of one rate limit bucket.
+    A new bucket only lets one request through until we learn its limits from the response headers.
+    """
+
+    def __init__(self):
+        self.limit = 1
+        self.remaining = 1
+        self.resetAt = 0.0  # time.monotonic() value where remaining goes back to limit
+        self.window = 0.0  # the last reset-after we were told, used to guess the next reset until a response arrives
+        self.resetStamp = 0.0  # the last X-RateLimit-Reset (epoch seconds), a bigger one means a new window
+        self.inflight = 0  # reserved requests that did not get a response yet
+        self.known = False
+
+    def reserve(self, now: float) -> float:
+        if self.known and now >= self.resetAt:
+            self.remaining = self.limit
+            self.resetAt = now + self.window
+
+        if self.remaining > 0:
+            self.remaining -= 1
+            self.inflight += 1
+            return 0.0
+
+        if not self.known:
+            return UNKNOWN_WAIT
+
+        return max(self.resetAt - now, 0.001)
+
+
+class RateLimiter:
+    """
+    Keeps track of every bucket and the global limit.
+    Usage (blocking):
+        while (wait := limiter.reserve(key)) > 0:
+            time.sleep(wait)
+        res = send()
+        retry = limiter.update(key, res.status_code, res.headers, body)
+    :param int globalLimit: The amount of requests allowed per second across every bucket.
+    """
+
+    def __init__(self, globalLimit: int = GLOBAL_LIMIT):
+        self.globalLimit = globalLimit
+        self._lock = threading.Lock()
+        self._buckets: dict[str, Bucket] = {}  # bucket hash (or route key before we know the hash) -> Bucket
+        self._routes: dict[str, str] = {}  # route key -> bucket hash
+        self._globalUntil = 0.0  # set when we get a global 429
+        self._windowStart = 0.0
+        self._windowCount = 0
+
+        self.hits429 = 0
+
+    def _bucket(self, key: str) -> Bucket:
+        name = self._routes.get(key, key)
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            bucket = Bucket()
+            self._buckets[name] = bucket
+        return bucket
+
+    def reserve(self, key: str) -> float:
+        """
+        Tries to take a slot for a request.
+        :param str key: The route key (see routeKey).
+        :return float: 0 if the request can be sent now (the slot is taken), otherwise the seconds to wait before trying again.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._globalUntil:
+                return self._globalUntil - now
+
+            if now - self._windowStart >= 1:
+                self._windowStart = now
+                self._windowCount = 0
+            if self._windowCount >= self.globalLimit:
+                return self._windowStart + 1 - now
+
+            wait = self._bucket(key).reserve(now)
+            if wait == 0:
+                self._windowCount += 1
+            return wait
+
+    def update(self, key: str, status: int, headers, body=None) -> float:
+        """
+        Updates the bucket from a response.
+        :param str key: The route key the request was sent with.
+        :param int status: The http status code.
+        :param headers: The response headers (any case-insensitive mapping).
+        :param body: The decoded json body (only used for 429s).
+        :return float: 0 if the response is final, otherwise the seconds to wait before retrying the request.
+        """
+        with self._lock:
+            now = time.monotonic()
+            bucketHash = headers.get("X-RateLimit-Bucket")
+            if bucketHash is not None and self._routes.get(key) != bucketHash:
+                # the route shares a bucket with other routes, move over to the shared one
+                old = self._buckets.pop(key, None)
+                self._routes[key] = bucketHash
+                if bucketHash not in self._buckets:
+                    self._buckets[bucketHash] = old if old is not None else Bucket()
+
+            bucket = self._bucket(key)
+            bucket.inflight = max(bucket.inflight - 1, 0)
+
+            limit = headers.get("X-RateLimit-Limit")
+            if limit is not None:
+                remaining = int(headers.get("X-RateLimit-Remaining", bucket.remaining)) - bucket.inflight
+                resetStamp = float(headers.get("X-RateLimit-Reset", 0))
+                if not bucket.known or resetStamp > bucket.resetStamp:
+                    # a new window, the header is the truth (minus what we sent since)
+                    bucket.remaining = max(remaining, 0)
+                    bucket.resetStamp = resetStamp
+                    bucket.window = float(headers.get("X-RateLimit-Reset-After", 0))
+                    bucket.resetAt = now + bucket.window
+                else:
+                    # same window, an older (or out of order) response can not give slots back
+                    bucket.remaining = max(min(bucket.remaining, remaining), 0)
+                bucket.known = True
+                bucket.limit = int(limit)
+            elif not bucket.known:
+                # no rate limit headers at all, don't hold the route back
+                bucket.known = True
+                bucket.limit = bucket.remaining = self.globalLimit
+                bucket.resetAt = now
+
+            if status != 429:
+                return 0.0
+
+            self.hits429 += 1
+            body = body if isinstance(body, dict) else {}
+            retryAfter = float(body.get("retry_after", headers.get("Retry-After", 1)))
+
+            if body.get("global", False) or headers.get("X-RateLimit-Global") is not None:
+                self._globalUntil = now + retryAfter
+            else:
+                bucket.remaining = 0
+                bucket.resetAt = max(bucket.resetAt, now + retryAfter)
+
+            return retryAfter
+
+    def release(self, key: str) -> None:
+        """
+        Gives back the slot taken by reserve for a request that never got a response (ex: a connection error).
+        Unlike update, nothing is learned about the bucket, it stays unknown if it was.
+        :param str key: The route key the request was reserved with.
+        """
+        with self._lock:
+            bucket = self._bucket(key)
+            bucket.inflight = max(bucket.inflight - 1, 0)
+            bucket.remaining = min(bucket.remaining + 1, bucket.limit)
+            if self._windowCount > 0:
+                self._windowCount -= 1  # the request never went out, it does not count against the global limit
+
+
+GLOBAL_RateLimiter: RateLimiter | None = None
+_limiterLock = threading.Lock()
+
+
+def getRateLimiter() -> RateLimiter:
+    """
+    Returns the shared RateLimiter (created on first use).
+    """
+    global GLOBAL_RateLimiter
+    if GLOBAL_RateLimiter is None:
+        with _limiterLock:
+            if GLOBAL_RateLimiter is None:
+                GLOBAL_RateLimiter = RateLimiter()
+
+    return GLOBAL_RateLimiter
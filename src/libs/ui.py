@@ -5,8 +5,16 @@ Contains UI objects and essentially the entire UI system.
 ModCord Version (based upon ArjunLauncher Version)
 """
 import pathlib
+import bisect
+import io
+import threading
 import math
+import re
+import time
+import collections
+import itertools
 import pygame.freetype
+from libs import profiler
 from typing import Sequence, Callable, Tuple, Union, Optional
 
 RGBAOutput = Tuple[int, int, int, int]
@@ -14,6 +22,9 @@ ColorValue = Union[pygame.Color, int, Tuple[int, int, int], RGBAOutput, Sequence
 Coordinate = Union[Tuple[float, float], Sequence[float]]
 STYLE_DEFAULT = pygame.freetype.STYLE_DEFAULT
 
+_fontIds = itertools.count(1)  # unique per CUIFont, id() can be reused after a font is garbage collected
+METRICS_CACHE_SIZE = 2048  # measured strings kept per CUIFont
+
 
 class CUColor(pygame.Color):
     """
@@ -117,7 +128,7 @@ class CUColor(pygame.Color):
 class CUIFont(pygame.freetype.Font):
     """
     A Font class that works better in most scenarios.
-    :param str location: The file path of the font file.
+    :param str location: The file path of the font file (or a file object, see CUIFontRegistry).
     :param float fontSize: The size to render the font at.
     :param CUColor fgColor: The foreground color of the text.
     :param CUColor bgColor: The background color of the text (optional defaults to None).
@@ -133,12 +144,77 @@ class CUIFont(pygame.freetype.Font):
                  font_index: int = 0, resolution: int = 0, ucs4: int = False, ColorList: list[
                 CUColor] = None) -> None:
 
-        newLoc = pathlib.Path(location)
-        super().__init__(newLoc.absolute(), size=fontSize, font_index=font_index, resolution=resolution, ucs4=ucs4)
+        newLoc = pathlib.Path(location).absolute() if isinstance(location, (str, pathlib.PurePath)) else location
+        super().__init__(newLoc, size=fontSize, font_index=font_index, resolution=resolution, ucs4=ucs4)
         self.fgcolor = fgColor
         if bgColor is not None:
             self.bgcolor = bgColor
         self.ColorList = ColorList
+        self.cacheId = next(_fontIds)
+        self._metrics: collections.OrderedDict[tuple, pygame.Rect] = collections.OrderedDict()
+        self._advances: dict[tuple, float] = {}
+
+    def measure(self, text: str, size: float = 0, style: int = STYLE_DEFAULT) -> pygame.rect.Rect:
+        """
+        Same as get_rect (without rotation), but remembers the result.
+        The size and style are part of the key, so changing either never returns a stale rect.
+        :param str text: The text to measure.
+        :param float size: The size to measure at (optional defaults to the font size).
+        :param int style:
+        :return: pygame.rect.Rect (a copy, safe to modify)
+        """
+        key = (text, size or self.size, self.style if style == STYLE_DEFAULT else style)
+        rect = self._metrics.get(key)
+        if rect is None:
+            rect = self.get_rect(text, style=style, size=size)
+            self._metrics[key] = rect
+            if len(self._metrics) > METRICS_CACHE_SIZE:
+                self._metrics.popitem(last=False)
+        else:
+            self._metrics.move_to_end(key)
+
+        return rect.copy()
+
+    def advance(self, text: str, size: float = 0, style: int = STYLE_DEFAULT) -> float:
+        """
+        The horizontal advance (how far the pen moves) of text, from per character metrics.
+        Used to update a width incrementally when characters are appended instead of measuring the whole string.
+        WARN: Ignores kerning, so it can be off by a pixel or two from measure().
+        :param str text: Usually a single character.
+        :param float size: The size to measure at (optional defaults to the font size).
+        :param int style:
+        :return float: The advance in pixels.
+        """
+        size = size or self.size
+        style = self.style if style == STYLE_DEFAULT else style
+        total = 0.0
+        for char in text:
+            key = (char, size, style)
+            adv = self._advances.get(key)
+            if adv is None:
+                metrics = self.get_metrics(char, size=size)
+                adv = metrics[0][4] if metrics and metrics[0] is not None else 0.0
+                self._advances[key] = adv
+            total += adv
+
+        return total
+
+    def cached_render_to(self, surf: pygame.Surface, dest, text: str, fgcolor: Optional[CUColor] = None,
+                         bgcolor: Optional[CUColor] = None, style: int = STYLE_DEFAULT,
+                         size: float = 0) -> pygame.rect.Rect:
+        """
+        Same as render_to (without rotation), but the text is rendered once and then blitted from GLOBAL_TextCache.
+        :param Surface surf: The pygame.Surface.
+        :param Coordinate dest: The position of where to place the text.
+        :param str text: The text the font is rendering.
+        :param CUColor fgcolor: The foreground color of the text (optional defaults to the one defined on creation).
+        :param CUColor bgcolor: The background color of the text (optional defaults to the one defined on creation).
+        :param int style:
+        :param float size:
+        :return: pygame.rect.Rect
+        """
+        textSurf = GLOBAL_TextCache.get(self, text, fgcolor, bgcolor, style, size)
+        return surf.blit(textSurf, (dest[0], dest[1]))
 
     def multiline_render_to(self, surf: pygame.Surface, dest, text: str, fgcolor: Optional[CUColor] = None,
                             bgcolor: Optional[CUColor] = None, style: int = STYLE_DEFAULT, rotation: int = 0,
@@ -161,12 +237,45 @@ class CUIFont(pygame.freetype.Font):
         for i, line in enumerate(ListText):
             if useColorList:
                 self.fgcolor = self.ColorList[i % len(self.ColorList)]
-            rect = self.render_to(surf=surf, dest=(dest[0], dest[1] + (i * self.size + 10)), text=line, fgcolor=fgcolor,
-                                  bgcolor=bgcolor, style=style, rotation=rotation, size=size)
+            lineDest = (dest[0], dest[1] + (i * self.size + 10))
+            if rotation == 0:
+                rect = self.cached_render_to(surf, lineDest, line, fgcolor=fgcolor, bgcolor=bgcolor, style=style,
+                                             size=size)
+            else:
+                rect = self.render_to(surf=surf, dest=lineDest, text=line, fgcolor=fgcolor, bgcolor=bgcolor,
+                                      style=style, rotation=rotation, size=size)
             ListRects.append(rect)
 
         return ListRects
 
+    def line_height(self, size: float = 0) -> int:
+        """
+        The distance between two wrapped lines.
+        """
+        return self.get_sized_height(size or self.size)
+
+    def wrap(self, text: str, width: float, size: float = 0) -> tuple[str, ...]:
+        """
+        Word wraps text to a width (line breaks are cached, see CUITextLayout).
+        :param str text: The text, explicit newlines are kept.
+        :param float width: The width in pixels.
+        :param float size: The size to wrap at (optional defaults to the font size).
+        :return: The lines.
+        """
+        return GLOBAL_TextLayout.wrap(self, text, width, size)
+
+    def wrapped_render_to(self, surf: pygame.Surface, dest, text: str, width: float,
+                          fgcolor: Optional[CUColor] = None, bgcolor: Optional[CUColor] = None,
+                          style: int = STYLE_DEFAULT, size: float = 0) -> list[pygame.rect.Rect]:
+        """
+        Same as multiline_render_to, but word wrapped to width and spaced by line_height.
+        :return: list[pygame.rect.Rect]
+        """
+        lineHeight = self.line_height(size)
+        return [self.cached_render_to(surf, (dest[0], dest[1] + i * lineHeight), line, fgcolor=fgcolor,
+                                      bgcolor=bgcolor, style=style, size=size)
+                for i, line in enumerate(self.wrap(text, width, size))]
+
     def multiline_render(self, text: str, fgcolor: Optional[CUColor] = None, bgcolor: Optional[CUColor] = None,
                          style: int = STYLE_DEFAULT, rotation: int = 0, size: float = 0) -> list[
                          Tuple[pygame.Surface, pygame.rect.Rect]]:
@@ -203,7 +312,10 @@ class CUIFont(pygame.freetype.Font):
         :param y:
         :return:
         """
-        rect = self.get_rect(text=text, style=style, rotation=rotation, size=size)
+        if rotation == 0:
+            rect = self.measure(text, size=size, style=style)
+        else:
+            rect = self.get_rect(text=text, style=style, rotation=rotation, size=size)
         if x:
             rect.centerx = surf.get_rect().centerx
 
@@ -213,14 +325,248 @@ class CUIFont(pygame.freetype.Font):
         return rect
 
 
+class CUIFontRegistry:
+    """
+    Reads every font file once, fonts are then created from memory (no file access per CUIFont).
+    Every call still returns a new CUIFont, widgets change their font (size, colors) so they can't be shared.
+    Use the GLOBAL_FontRegistry instance instead of creating one.
+    """
+
+    def __init__(self):
+        self._files: dict[str, bytes] = {}
+        self._lock = threading.Lock()  # menus can be built from any thread
+
+    def data(self, location: str) -> bytes:
+        """
+        The content of a font file, read on first use.
+        """
+        path = str(pathlib.Path(location).absolute())
+        data = self._files.get(path)
+        if data is None:
+            with self._lock:
+                data = self._files.get(path)
+                if data is None:
+                    data = pathlib.Path(path).read_bytes()
+                    self._files[path] = data
+        return data
+
+    def font(self, location: str, fontSize: Union[float, Tuple[float, float]], fgColor: CUColor,
+             bgColor: CUColor = None, **kwargs) -> CUIFont:
+        """
+        Same arguments as CUIFont, but the file is only read the first time.
+        :return: CUIFont
+        """
+        return CUIFont(io.BytesIO(self.data(location)), fontSize, fgColor, bgColor, **kwargs)
+
+    def stats(self) -> dict:
+        return {"files": len(self._files), "bytes": sum(len(d) for d in self._files.values())}
+
+
+GLOBAL_FontRegistry = CUIFontRegistry()
+
+
+class CUITextCache:
+    """
+    LRU cache of rendered text surfaces, keyed by font, size, style, colors and text.
+    Text that does not change between frames is rendered once and then only blitted.
+    Use the GLOBAL_TextCache instance instead of creating one (CUIFont.cached_render_to does).
+    :param int maxBytes: The memory cap of every cached surface together (pixels * bytes per pixel).
+    """
+
+    def __init__(self, maxBytes: int = 32 * 1024 * 1024):
+        self.maxBytes = maxBytes
+        self.bytes = 0
+        self._entries: collections.OrderedDict[tuple, pygame.Surface] = collections.OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, font: CUIFont, text: str, fgcolor: Optional[CUColor] = None, bgcolor: Optional[CUColor] = None,
+            style: int = STYLE_DEFAULT, size: float = 0) -> pygame.Surface:
+        """
+        Returns the rendered text, rendering it on a miss.
+        :return: The Surface (do NOT draw onto it, it is shared).
+        """
+        # resolve the defaults now, the font's own colors/size can be changed after the fact
+        fg = fgcolor if fgcolor is not None else font.fgcolor
+        bg = bgcolor if bgcolor is not None else font.bgcolor
+        key = (font.cacheId, size or font.size, font.style if style == STYLE_DEFAULT else style,
+               tuple(fg), tuple(bg) if bg is not None else None, text)
+
+        surf = self._entries.get(key)
+        if surf is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return surf
+
+        self.misses += 1
+        surf, _ = font.render(text, fgcolor=fg, bgcolor=bg, style=style, size=size)
+        cost = surf.get_width() * surf.get_height() * surf.get_bytesize()
+        if cost > self.maxBytes:
+            return surf  # would evict everything else, just don't cache it
+
+        self._entries[key] = surf
+        self.bytes += cost
+        while self.bytes > self.maxBytes:
+            _, old = self._entries.popitem(last=False)
+            self.bytes -= old.get_width() * old.get_height() * old.get_bytesize()
+            self.evictions += 1
+
+        return surf
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+GLOBAL_TextCache = CUITextCache()
+
+_WORDS = re.compile(r"\S+\s*|\s+")  # a word with the spaces after it (or leading spaces)
+
+
+class CUITextLayout:
+    """
+    Word wrapping with the line breaks remembered per (font, size, text).
+    Every entry also remembers the range of widths it is valid for (greedy wrapping gives the same lines until a
+    line stops fitting or the next word fits on the line before it), so after a resize only the texts
+    whose breaks actually move are wrapped again.
+    Use the GLOBAL_TextLayout instance instead of creating one (CUIFont.wrap does).
+    WARN: Uses CUIFont.advance (no kerning), lines can be a pixel or two off from measure().
+    :param int maxEntries: The amount of texts to remember (defaults to the message budget of message_store).
+    """
+
+    def __init__(self, maxEntries: int = 50000):
+        self.maxEntries = maxEntries
+        # (font id, size, text) -> (lines, smallest valid width, first invalid width above)
+        self._entries: collections.OrderedDict[tuple, tuple[tuple[str, ...], float, float]] = \
+            collections.OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.reflows = 0  # misses on a known text, because the width moved out of its valid range
+
+    def wrap(self, font: CUIFont, text: str, width: float, size: float = 0) -> tuple[str, ...]:
+        """
+        :return: The lines of text when wrapped to width (explicit newlines are kept).
+        """
+        return self.wrap_range(font, text, width, size)[0]
+
+    def wrap_range(self, font: CUIFont, text: str, width: float,
+                   size: float = 0) -> tuple[tuple[str, ...], float, float]:
+        """
+        Same as wrap, plus the range of widths the lines stay the same for, so a caller can keep them itself.
+        :return: (lines, smallest valid width, first invalid width above)
+        """
+        key = (font.cacheId, size or font.size, text)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            if entry[1] <= width < entry[2]:
+                self.hits += 1
+                return entry
+            self.reflows += 1
+        else:
+            self.misses += 1
+
+        entry = self._layout(font, text, width, size)
+        self._entries[key] = entry
+        if len(self._entries) > self.maxEntries:
+            self._entries.popitem(last=False)
+        return entry
+
+    @staticmethod
+    def _layout(font: CUIFont, text: str, width: float, size: float) -> tuple[tuple[str, ...], float, float]:
+        lines = []
+        lo = 0.0  # narrower than this and a line would not fit anymore
+        hi = math.inf  # this wide and a word would move up a line
+
+        for paragraph in text.split("\n"):
+            line = ""
+            lineWidth = 0.0  # including the trailing spaces
+            for token in _WORDS.findall(paragraph):
+                word = token.rstrip()
+                wordWidth = font.advance(word, size)
+                tokenWidth = font.advance(token, size)
+
+                if line and lineWidth + wordWidth <= width:
+                    line += token
+                    lineWidth += tokenWidth
+                    continue
+
+                if line:
+                    hi = min(hi, lineWidth + wordWidth)
+                    lines.append(line.rstrip())
+                    lo = max(lo, font.advance(lines[-1], size))
+
+                if wordWidth <= width:
+                    line = token
+                    lineWidth = tokenWidth
+                    continue
+
+                # a word wider than the whole line, break it anywhere
+                piece = ""
+                pieceWidth = 0.0
+                for char in word:
+                    charWidth = font.advance(char, size)
+                    if piece and pieceWidth + charWidth > width:
+                        hi = min(hi, pieceWidth + charWidth)  # this wide and the char stays on the piece
+                        lines.append(piece)
+                        lo = max(lo, pieceWidth)
+                        piece = ""
+                        pieceWidth = 0.0
+                    piece += char
+                    pieceWidth += charWidth
+                line = piece + token[len(word):]
+                lineWidth = pieceWidth + font.advance(token[len(word):], size)
+
+            lines.append(line.rstrip())
+            lo = max(lo, font.advance(lines[-1], size))
+
+        return tuple(lines), lo, hi
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses + self.reflows
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "reflows": self.reflows,
+            "hitRate": self.hits / total if total else 0.0,
+        }
+
+
+GLOBAL_TextLayout = CUITextLayout()
+
+
 class BaseObject:
     """
     This class is just meant to be the base of all basic objects like lines and circles.
     """
 
-    def draw(self, screen: pygame.Surface):
+    def draw(self, screen: pygame.Surface, offset: Sequence[float] = (0, 0)):
         pass
 
+    def bounds(self) -> pygame.Rect | None:
+        """
+        The area the object draws to, None if unknown (never culled by CGCamera).
+        """
+        return None
+
 
 class CRect(pygame.FRect):
     """
@@ -247,12 +593,21 @@ class CRect(pygame.FRect):
         self.draw_border_bottom_left_radius = draw_border_bottom_left_radius
         self.draw_border_bottom_right_radius = draw_border_bottom_right_radius
 
-    def draw(self, screen: pygame.Surface) -> None:
+    def bounds(self) -> pygame.Rect:
+        """
+        The area the object draws to, override this when drawing outside the rect (ex: text).
+        :return: pygame.Rect
+        """
+        return pygame.Rect(math.floor(self.x), math.floor(self.y), math.ceil(self.width) + 1, math.ceil(self.height) + 1)
+
+    def draw(self, screen: pygame.Surface, offset: Sequence[float] = (0, 0)) -> None:
         """
         Draws the rectangle on the provided surface.
         :param screen: A Surface to draw onto.
+        :param offset: Subtracted from the position (ex: a camera), the rect itself is never moved.
         """
-        pygame.draw.rect(screen, self.color, self, self.draw_width, self.draw_border_radius,
+        rect = self.move(-offset[0], -offset[1]) if offset[0] or offset[1] else self
+        pygame.draw.rect(screen, self.color, rect, self.draw_width, self.draw_border_radius,
                          self.draw_border_top_left_radius, self.draw_border_top_right_radius,
                          self.draw_border_bottom_left_radius, self.draw_border_bottom_right_radius)
 
@@ -273,12 +628,20 @@ class CLine(BaseObject):
         self.color = color
         self.draw_width = width
 
-    def draw(self, screen: pygame.Surface) -> None:
+    def bounds(self) -> pygame.Rect:
+        left = math.floor(min(self.start[0], self.end[0]) - self.draw_width)
+        top = math.floor(min(self.start[1], self.end[1]) - self.draw_width)
+        return pygame.Rect(left, top, math.ceil(max(self.start[0], self.end[0]) + self.draw_width) - left + 1,
+                           math.ceil(max(self.start[1], self.end[1]) + self.draw_width) - top + 1)
+
+    def draw(self, screen: pygame.Surface, offset: Sequence[float] = (0, 0)) -> None:
         """
         Draws a line on the provided surface.
         :param screen: A Surface to draw onto.
+        :param offset: Subtracted from the position (ex: a camera), the line itself is never moved.
         """
-        pygame.draw.line(screen, self.color, self.start, self.end, self.draw_width)  # noqa ; seq[float] != seq[float]??
+        pygame.draw.line(screen, self.color, (self.start[0] - offset[0], self.start[1] - offset[1]),
+                         (self.end[0] - offset[0], self.end[1] - offset[1]), self.draw_width)
 
     def set_pos(self, x: float, y: float):
         """
@@ -314,11 +677,14 @@ class CCircle(BaseObject):
         self.draw_bottom_left = draw_bottom_left
         self.draw_bottom_right = draw_bottom_right
 
-    def draw(self, screen: pygame.Surface):
-        pygame.draw.circle(screen, self.color, self.center, self.radius, self.draw_width, self.draw_top_right,  # noqa
-                           self.draw_top_left, self.draw_bottom_left,
-                           self.draw_bottom_right)
-        # ^ above noqa is because it's saying the self.center is type Sequence[float] which is not Sequence[float]????
+    def bounds(self) -> pygame.Rect:
+        return pygame.Rect(math.floor(self.center[0] - self.radius), math.floor(self.center[1] - self.radius),
+                           math.ceil(self.diameter) + 2, math.ceil(self.diameter) + 2)
+
+    def draw(self, screen: pygame.Surface, offset: Sequence[float] = (0, 0)):
+        pygame.draw.circle(screen, self.color, (self.center[0] - offset[0], self.center[1] - offset[1]),
+                           self.radius, self.draw_width, self.draw_top_right, self.draw_top_left,
+                           self.draw_bottom_left, self.draw_bottom_right)
 
 
 class CUIObject(CRect):
@@ -337,6 +703,15 @@ class CUIObject(CRect):
         self.registeredEvents = []
         self.hasDrawn = False  # used for defining if has been drawn
         self.tag = ""  # id tag, set externally.
+        self.dirty = True  # whether the object changed since its last draw (used by the dirty rect mode of CScaleScreen)
+        self.drawnBounds: pygame.Rect | None = None  # the area covered by the last draw, set by CScaleScreen.redraw
+
+    def invalidate(self):
+        """
+        Marks the object as changed, so it is redrawn (only matters in the dirty rect mode of CScaleScreen).
+        Call this whenever something that changes the look of the object is modified.
+        """
+        self.dirty = True
 
     def subscribe_event(self, event: pygame.Event):
         """
@@ -360,8 +735,8 @@ class CUIObject(CRect):
     def tick(self, event: pygame.Event, mouse_pos: tuple[int, int]):
         self.hasDrawn = False
 
-    def draw(self, screen: pygame.Surface) -> None:
-        super().draw(screen)
+    def draw(self, screen: pygame.Surface, offset: Sequence[float] = (0, 0)) -> None:
+        super().draw(screen, offset)
         self.hasDrawn = True
 
 
@@ -408,6 +783,7 @@ class CUIButton(CUIObject):
         self._defaultColor = x
         self.pressedColor = x.darken(20, retColor=True)
         self.highlightColor = x.darken(40, retColor=True)
+        self.invalidate()
 
     def tick(self, event: pygame.Event, mouse_pos: tuple[int, int]):
         """
@@ -417,6 +793,7 @@ class CUIButton(CUIObject):
         :param mouse_pos: Mouse position currently.
         :return:
         """
+        oldColor = self.color
         if event.type == pygame.MOUSEMOTION:
             if self.collidepoint(mouse_pos[0], mouse_pos[1]):
                 self.color = self.highlightColor
@@ -425,9 +802,12 @@ class CUIButton(CUIObject):
                 self.color = self.defaultColor
                 self.isHovered = False
 
+            if self.color != oldColor:
+                self.invalidate()
             return
 
         if event.type == pygame.MOUSEBUTTONDOWN:
+            wasPressed = self.isPressed
             if self.collidepoint(mouse_pos[0], mouse_pos[1]):
                 self.color = self.pressedColor
                 self.isPressed = True
@@ -437,6 +817,8 @@ class CUIButton(CUIObject):
                 self.color = self.defaultColor
                 self.isPressed = False
 
+            if self.color != oldColor or self.isPressed != wasPressed:
+                self.invalidate()
             return
 
         super().tick(event, mouse_pos)
@@ -465,8 +847,8 @@ class CUITextButton(CUIButton):
         super().__init__(x, y, width, height, defaultColor, pressedColor, highlightColor, onPress, **kwargs)
         self.font = font
         self._text = text
-        self.text_pos = (self.centerx - self.font.get_rect(text, size=self.font.size).width // 2,
-                         self.centery - self.font.get_rect(text, size=self.font.size).height // 2)
+        rect = self.font.measure(text, size=self.font.size)
+        self.text_pos = (self.centerx - rect.width // 2, self.centery - rect.height // 2)
 
         if len(text.split("\n")) > 1:
             self.multiline = True
@@ -480,15 +862,17 @@ class CUITextButton(CUIButton):
     @text.setter
     def text(self, value):
         self._text = value
-        self.text_pos = (self.centerx - self.font.get_rect(self._text, size=self.font.size).width // 2,
-                         self.centery - self.font.get_rect(self._text, size=self.font.size).height // 2)
+        rect = self.font.measure(self._text, size=self.font.size)
+        self.text_pos = (self.centerx - rect.width // 2, self.centery - rect.height // 2)
+        self.invalidate()
 
-    def draw(self, screen: pygame.Surface):
-        super().draw(screen)
+    def draw(self, screen: pygame.Surface, offset: Sequence[float] = (0, 0)):
+        super().draw(screen, offset)
+        pos = (self.text_pos[0] - offset[0], self.text_pos[1] - offset[1])
         if self.multiline:
-            self.font.multiline_render_to(screen, self.text_pos, self.text)
+            self.font.multiline_render_to(screen, pos, self.text)
         else:
-            self.font.render_to(screen, self.text_pos, self.text)
+            self.font.cached_render_to(screen, pos, self.text)
 
 
 class CUILabel(CUIObject):
@@ -506,21 +890,197 @@ class CUILabel(CUIObject):
         self.text = text
         self.registeredEvents = []  # prevent wasting time due to accidental addiction to manager
 
-        if len(self.text.split("\n")) > 1:
-            self.multiline = True
-        else:
-            self.multiline = False
+    @property
+    def text(self):
+        return self._text
 
-    def draw(self, screen: pygame.Surface) -> None:
+    @text.setter
+    def text(self, value):
+        if getattr(self, "_text", None) == value:
+            return
+        self._text = value
+        self.multiline = len(value.split("\n")) > 1
+        self.invalidate()
+
+    def bounds(self) -> pygame.Rect:
+        lines = self.text.splitlines() if self.multiline else [self.text]
+        rect = pygame.Rect(math.floor(self.x), math.floor(self.y), 1, 1)
+        for i, line in enumerate(lines):
+            lineRect = self.font.measure(line)
+            lineRect.topleft = (rect.x, rect.y + ((i * self.font.size + 10) if self.multiline else 0))
+            rect.union_ip(lineRect)
+        return rect.inflate(2, 2)
+
+    def draw(self, screen: pygame.Surface, offset: Sequence[float] = (0, 0)) -> None:
+        pos = (self.x - offset[0], self.y - offset[1])
         if self.multiline:
-            self.font.multiline_render_to(screen, (self.x, self.y), self.text)
+            self.font.multiline_render_to(screen, pos, self.text)
+        else:
+            self.font.cached_render_to(screen, pos, self.text)
+
+
+class CUITextBuffer:
+    """
+    A gap buffer with a cursor, a selection and a capped undo stack, used by CUITextInput.
+    Edits at the cursor are O(1) (moving the cursor costs the distance moved), undo stores only what changed.
+    Every edit returns (removed, inserted) so callers can update anything derived from the text incrementally.
+    :param str text: The starting text.
+    :param int limit: The maximum amount of characters (optional defaults to no limit).
+    """
+    GAP = 64  # minimum free space added when the gap is full
+    UNDO_LIMIT = 200  # edits kept, typing a word is one edit
+
+    def __init__(self, text: str = "", limit: int = None):
+        self.limit = limit
+        self._chars: list[str] = list(text) + [""] * self.GAP
+        self._gapStart = len(text)  # == the cursor
+        self._gapEnd = len(self._chars)
+        self._text: str | None = text  # joined text, None once an edit happened
+        self.anchor: int | None = None  # the other end of the selection (the cursor being one end)
+        self._undo: collections.deque[tuple[int, str, str]] = collections.deque(maxlen=self.UNDO_LIMIT)
+
+    def __len__(self):
+        return len(self._chars) - (self._gapEnd - self._gapStart)
+
+    @property
+    def cursor(self) -> int:
+        return self._gapStart
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = "".join(self._chars[:self._gapStart]) + "".join(self._chars[self._gapEnd:])
+        return self._text
+
+    def _moveGap(self, pos: int):
+        if pos < self._gapStart:
+            n = self._gapStart - pos
+            self._chars[self._gapEnd - n:self._gapEnd] = self._chars[pos:self._gapStart]
+            self._gapStart -= n
+            self._gapEnd -= n
+        elif pos > self._gapStart:
+            n = pos - self._gapStart
+            self._chars[self._gapStart:self._gapStart + n] = self._chars[self._gapEnd:self._gapEnd + n]
+            self._gapStart += n
+            self._gapEnd += n
+
+    def _insertRaw(self, pos: int, text: str):
+        self._moveGap(pos)
+        if self._gapEnd - self._gapStart < len(text):
+            grow = max(len(text), self.GAP, len(self) // 2)
+            self._chars[self._gapEnd:self._gapEnd] = [""] * grow
+            self._gapEnd += grow
+        self._chars[self._gapStart:self._gapStart + len(text)] = text
+        self._gapStart += len(text)
+        self._text = None
+
+    def _deleteRaw(self, start: int, end: int) -> str:
+        self._moveGap(start)
+        removed = "".join(self._chars[self._gapEnd:self._gapEnd + end - start])
+        self._gapEnd += end - start
+        self._text = None
+        return removed
+
+    def _edit(self, start: int, end: int, text: str, record: bool = True) -> tuple[str, str]:
+        removed = self._deleteRaw(start, end) if end > start else ""
+        if text:
+            self._insertRaw(start, text)
         else:
-            self.font.render_to(screen, (self.x, self.y), self.text)
+            self._moveGap(start)
+        self.anchor = None
+
+        if record and (removed or text):
+            last = self._undo[-1] if self._undo else None
+            if (last is not None and not removed and not last[1] and len(text) == 1 and not text.isspace()
+                    and last[0] + len(last[2]) == start and not last[2][-1:].isspace()):
+                self._undo[-1] = (last[0], "", last[2] + text)  # same word, one undo step
+            else:
+                self._undo.append((start, removed, text))
+
+        return removed, text
+
+    def selection(self) -> tuple[int, int] | None:
+        """
+        :return: (start, end) of the selection, None if nothing is selected.
+        """
+        if self.anchor is None or self.anchor == self.cursor:
+            return None
+        return min(self.anchor, self.cursor), max(self.anchor, self.cursor)
+
+    def selected_text(self) -> str:
+        sel = self.selection()
+        return self.text[sel[0]:sel[1]] if sel is not None else ""
+
+    def span(self, start: int, end: int) -> str:
+        """
+        The text between two positions, without joining the whole text or moving the gap (costs end - start).
+        """
+        gap = self._gapEnd - self._gapStart
+        if end <= self._gapStart:
+            return "".join(self._chars[start:end])
+        if start >= self._gapStart:
+            return "".join(self._chars[start + gap:end + gap])
+        return "".join(self._chars[start:self._gapStart]) + "".join(self._chars[self._gapEnd:end + gap])
+
+    def move(self, pos: int, select: bool = False):
+        """
+        Moves the cursor.
+        :param int pos: The new position (clamped).
+        :param bool select: Extend the selection instead of clearing it (ex: shift held).
+        """
+        pos = min(max(pos, 0), len(self))
+        if select and self.anchor is None:
+            self.anchor = self.cursor
+        elif not select:
+            self.anchor = None
+        self._moveGap(pos)
+
+    def select_all(self):
+        self._moveGap(len(self))
+        self.anchor = 0
+
+    def insert(self, text: str) -> tuple[str, str]:
+        """
+        Types/pastes text at the cursor (replacing the selection), cut to fit the limit.
+        """
+        start, end = self.selection() or (self.cursor, self.cursor)
+        if self.limit is not None:
+            text = text[:max(self.limit - (len(self) - (end - start)), 0)]
+        if not text and start == end:
+            return "", ""
+        return self._edit(start, end, text)
+
+    def backspace(self) -> tuple[str, str]:
+        start, end = self.selection() or (max(self.cursor - 1, 0), self.cursor)
+        return self._edit(start, end, "") if end > start else ("", "")
+
+    def delete(self) -> tuple[str, str]:
+        start, end = self.selection() or (self.cursor, min(self.cursor + 1, len(self)))
+        return self._edit(start, end, "") if end > start else ("", "")
+
+    def set(self, text: str) -> tuple[str, str]:
+        """
+        Replaces the whole text (can be undone).
+        """
+        if self.limit is not None:
+            text = text[:self.limit]
+        return self._edit(0, len(self), text)
+
+    def undo(self) -> tuple[str, str]:
+        """
+        Reverts the last edit.
+        :return: (removed, inserted) of the revert, ("", "") if there was nothing to undo.
+        """
+        if not self._undo:
+            return "", ""
+        pos, removed, inserted = self._undo.pop()
+        return self._edit(pos, pos + len(inserted), removed, record=False)
 
 
 class CUITextInput(CUIButton):
     """
     Just a button that records the key presses.
+    Editing goes through a CUITextBuffer: arrows/home/end move the cursor (with shift to select), ctrl+a/c/x/v/z work.
     :param float x: The x position of the object.
     :param float y: The y position of the object.
     :param float width: The width of the object.
@@ -530,10 +1090,11 @@ class CUITextInput(CUIButton):
     :param str placeholder_text: The string for the placeholder text.
     :param CUColor pressedColor: Optional pressed color, defaults to defaultColor.darken(20)
     :param CUColor highlightColor: Optional highlighted color, defaults to defaultColor.darken(40)
-    :param int charLimit: The maximum number of characters that can be inputted into the textbox.
+    :param int charLimit: The maximum number of characters that can be inputted into the textbox (pastes included).
     :param list allowedKeys: The keys that are allowed to be typed - defaults to all.
     :param Callable onTextUpdate: The function to call upon the text being updated.
     """
+    PADDING = 8  # between the border and the text, when the text is wider than the box
 
     def __init__(self, x: float, y: float, width: float, height: float, defaultColor: CUColor, font: CUIFont,
                  placeholder_text: str, pressedColor: CUColor = None, highlightColor: CUColor = None,
@@ -545,78 +1106,495 @@ class CUITextInput(CUIButton):
         self.placeholder_text = placeholder_text
         self.placeholder_font = self.font
         self.placeholder_font.fgcolor = CUColor(self.placeholder_font.fgcolor).darken(20)
-        self.text = ""
-        self.history = [""]
+        self.buffer = CUITextBuffer(limit=charLimit)
         self.registeredEvents = [pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION, pygame.KEYDOWN, pygame.KEYUP]
-        self.ctrlPressed = False
         self.character_limit = charLimit
         self.allowed_keys = allowedKeys
         self.textUpdateFunc = onTextUpdate  # WARN: DO NOT NAME self.func BREAKS BC OF SUPER BUTTON
         self.shrink = shrink
+        self.textWidth = 0.0  # kept up to date while typing, so we never measure the whole text per key
+        # same for the caret and the selection: the x (from the left of the text) of the cursor and of the anchor
+        self.cursorX = 0.0
+        self.anchorX = 0.0
+        self._cursorPos = 0  # the position cursorX was measured at
+        self._measuredSize = font.size  # the font size the widths were measured at (the font can be shared)
+        self.scrollX = 0.0  # how far the text is scrolled left, once it is wider than the box
+
+    @property
+    def innerWidth(self) -> float:
+        return self.width - self.PADDING * 2
+
+    def _syncFont(self):
+        """
+        Measures everything again if the font size changed (ex: another input sharing the font shrank it).
+        """
+        if self.font.size == self._measuredSize:
+            return
+        buffer = self.buffer
+        self._measuredSize = self.font.size
+        self.textWidth = self.font.advance(buffer.text)
+        self.cursorX = self.font.advance(buffer.span(0, buffer.cursor))
+        if buffer.anchor is not None:
+            self.anchorX = self.font.advance(buffer.span(0, buffer.anchor))
+        self._follow()
+
+    def _follow(self):
+        """
+        Scrolls so the caret stays inside the box, never past the end of the text.
+        """
+        inner = self.innerWidth
+        if self.cursorX - self.scrollX > inner:
+            self.scrollX = self.cursorX - inner
+        elif self.cursorX < self.scrollX:
+            self.scrollX = self.cursorX
+        self.scrollX = min(max(self.scrollX, 0.0), max(self.textWidth - inner, 0.0))
+
+    @property
+    def text(self) -> str:
+        return self.buffer.text
+
+    @text.setter
+    def text(self, value: str):
+        self._edited(self.buffer.set(str(value)))
+
+    def _edited(self, change: tuple[str, str]):
+        self._syncFont()
+        removed, inserted = change
+        buffer = self.buffer
+        # every edit leaves the cursor right after what it inserted, the text before start did not change
+        start = buffer.cursor - len(inserted)
+        old = self._cursorPos
+        if old <= start:
+            x = self.cursorX + self.font.advance(buffer.span(old, start))
+        else:
+            # the text that was between start and the old cursor
+            if old - start <= len(removed):
+                between = removed[:old - start]
+            else:  # ex: an undo before the cursor
+                between = removed + buffer.span(start + len(inserted), old - len(removed) + len(inserted))
+            x = self.cursorX - self.font.advance(between)
+        self.cursorX = x + self.font.advance(inserted)
+        self._cursorPos = buffer.cursor
+
+        if not removed and not inserted:
+            self._follow()
+            return
+
+        self.textWidth += self.font.advance(inserted) - self.font.advance(removed)
+        self.invalidate()
+        if self.textUpdateFunc is not None:
+            self.textUpdateFunc(self.text)
+
+        if self.textWidth >= self.width:
+            if self.font.size > 1:
+                self.font.size -= 1
+                self._syncFont()  # every character got smaller
+        self._follow()  # a shorter text pulls the scroll back
+
+    def _move(self, pos: int, select: bool = False):
+        """
+        Moves the cursor, the caret x is updated by the width of the characters it moved over.
+        """
+        self._syncFont()
+        buffer = self.buffer
+        old = buffer.cursor
+        if select and buffer.anchor is None:
+            self.anchorX = self.cursorX
+        buffer.move(pos, select)
+
+        new = buffer.cursor
+        if new > old:
+            self.cursorX += self.font.advance(buffer.span(old, new))
+        elif new < old:
+            self.cursorX -= self.font.advance(buffer.span(new, old))
+        self._cursorPos = new
+        self._follow()
 
     def tick(self, event: pygame.Event, mouse_pos: tuple[int, int]):
         if event.type == pygame.KEYDOWN and self.isPressed:
+            self.invalidate()
+            buffer = self.buffer
+            ctrl = event.mod & pygame.KMOD_CTRL
+            shift = bool(event.mod & pygame.KMOD_SHIFT)
+
             if event.key == pygame.K_BACKSPACE:
-                self.text = self.text[:-1]
+                self._edited(buffer.backspace())
+            elif event.key == pygame.K_DELETE:
+                self._edited(buffer.delete())
             elif event.key == pygame.K_RETURN:
                 self.isPressed = False
                 self.isHovered = False
-            elif event.key == pygame.K_LCTRL:
-                self.ctrlPressed = True
-
-            elif event.key == pygame.K_v and self.ctrlPressed:
+            elif event.key == pygame.K_LEFT:
+                sel = buffer.selection()
+                self._move(sel[0] if sel and not shift else buffer.cursor - 1, shift)
+            elif event.key == pygame.K_RIGHT:
+                sel = buffer.selection()
+                self._move(sel[1] if sel and not shift else buffer.cursor + 1, shift)
+            elif event.key == pygame.K_HOME:
+                self._move(0, shift)
+            elif event.key == pygame.K_END:
+                self._move(len(buffer), shift)
+
+            elif ctrl and event.key == pygame.K_a:
+                self._syncFont()
+                buffer.select_all()
+                self.anchorX = 0.0
+                self.cursorX = self.textWidth
+                self._cursorPos = buffer.cursor
+                self._follow()
+            elif ctrl and event.key in (pygame.K_c, pygame.K_x):
+                if buffer.selection() is not None:
+                    pygame.scrap.put_text(buffer.selected_text())
+                    if event.key == pygame.K_x:
+                        self._edited(buffer.backspace())
+            elif ctrl and event.key == pygame.K_v:
                 if pygame.scrap.has_text():
-                    self.text += pygame.scrap.get_text()
-            elif event.key == pygame.K_z and self.ctrlPressed:
-                self.text = self.history[-1]
-                if len(self.history) > 1:
-                    del self.history[-1]
-
-            elif len(self.text) < self.character_limit:
-                if self.allowed_keys:
-                    if event.unicode not in self.allowed_keys:
-                        return
-
-                self.text += event.unicode
-                self.history.append(self.text)
-
-                self.textUpdateFunc(self.text)
-
-                if self.font.get_rect(self.text).width >= self.width:
-                    if self.font.size > 1:
-                        self.font.size -= 1
+                    pasted = pygame.scrap.get_text().replace("\r", "").replace("\n", " ")
+                    if self.allowed_keys:
+                        pasted = "".join(c for c in pasted if c in self.allowed_keys)
+                    self._edited(buffer.insert(pasted))  # cut to charLimit by the buffer
+            elif ctrl and event.key == pygame.K_z:
+                self._edited(buffer.undo())
+
+            elif event.unicode and event.unicode.isprintable() and not ctrl:
+                if self.allowed_keys and event.unicode not in self.allowed_keys:
+                    return
+                self._edited(buffer.insert(event.unicode))
 
             return
 
         if event.type == pygame.KEYUP and self.isPressed:
-            if event.key == pygame.K_LCTRL and self.ctrlPressed:
-                self.ctrlPressed = False
-
             return
 
         super().tick(event, mouse_pos)
 
-    def draw(self, screen: pygame.Surface):
-        super().draw(screen)
-        self.text = str(self.text)  # str needed :shrug: "well-designed language"
+    def draw(self, screen: pygame.Surface, offset: Sequence[float] = (0, 0)):
+        super().draw(screen, offset)
+        cx = self.centerx - offset[0]
+        cy = self.centery - offset[1]
         if len(self.text) <= 0 and not self.isPressed:
             t = self.placeholder_text
-            self.placeholder_font.render_to(screen, (
-                self.centerx - self.font.get_rect(t, size=self.font.size).width // 2,
-                self.centery - self.font.get_rect(t, size=self.font.size).height // 2), t)
+            rect = self.font.measure(t, size=self.font.size)
+            self.placeholder_font.cached_render_to(screen, (cx - rect.width // 2, cy - rect.height // 2), t)
+            return
+
+        self._syncFont()
+        t = self.text
+        rect = self.font.measure(t, size=self.font.size)
+        top = cy - self.font.size // 2
+        oldClip = None
+        if self.textWidth <= self.innerWidth:
+            left = cx - rect.width // 2
+        else:  # too wide, scrolled and clipped to the box
+            left = self.x - offset[0] + self.PADDING - self.scrollX
+            oldClip = screen.get_clip()
+            screen.set_clip(pygame.Rect(self.x - offset[0] + self.PADDING, self.y - offset[1],
+                                        self.innerWidth, self.height).clip(oldClip))
+
+        if self.buffer.selection() is not None and self.isPressed:
+            pygame.draw.rect(screen, self.highlightColor, (left + min(self.anchorX, self.cursorX), top,
+                                                           abs(self.cursorX - self.anchorX), self.font.size))
+
+        self.font.cached_render_to(screen, (left, cy - rect.height // 2), t)
+
+        if self.isPressed:
+            caret = left + self.cursorX
+            pygame.draw.line(screen, self.font.fgcolor, (caret, top), (caret, top + self.font.size))
+
+        if oldClip is not None:
+            screen.set_clip(oldClip)
+
+
+class CUIVirtualList(CUIObject):
+    """
+    A scrolling list that only lays out and draws the rows inside the viewport (plus a few rows of overscan).
+    Rows are CUILabels that get recycled while scrolling, so the cost does not depend on the amount of items.
+    :param float x: The x position of the viewport.
+    :param float y: The y position of the viewport.
+    :param float width: The width of the viewport.
+    :param float height: The height of the viewport.
+    :param CUColor color: The background color.
+    :param CUIFont font: The font used for every row.
+    :param float rowHeight: The height of every row.
+    :param Callable getText: getText(index) -> str, called only when a row comes into view.
+    :param int count: The amount of items.
+    :param int overscan: The amount of extra rows to keep above and below the viewport.
+    :param Callable onReachTop: Called when scrolled to the top (ex: to load older messages) (optional).
+    :param Callable onSelect: onSelect(index), called when an item is clicked (optional).
+    :param bool wrap: Word wrap the items to the width (rowHeight is then the height of one line), items get
+                      as tall as they need. Every item keeps the range of widths its lines are valid for,
+                      so resizing only re-wraps the items whose line breaks move (and prepending only the new items).
+    """
+    PADDING = 5  # left and right of the text
+
+    def __init__(self, x: float, y: float, width: float, height: float, color: CUColor, font: CUIFont,
+                 rowHeight: float, getText: Callable[[int], str], count: int = 0, overscan: int = 2,
+                 onReachTop: Callable = None, onSelect: Callable[[int], None] = None, wrap: bool = False):
+        super().__init__(x, y, width, height, color)
+        self.font = font
+        self.rowHeight = rowHeight
+        self.getText = getText
+        self.count = count
+        self.overscan = overscan
+        self.onReachTop = onReachTop
+        self.onSelect = onSelect
+        self.scroll = 0.0  # pixels between the top of the list and the top of the viewport
+
+        self.registeredEvents = [pygame.MOUSEWHEEL]
+        if onSelect is not None:
+            self.registeredEvents.append(pygame.MOUSEBUTTONDOWN)
+        self.rows: dict[int, CUILabel] = {}  # index -> row currently showing it
+        self._free: list[CUILabel] = []  # rows that scrolled out, ready to be reused
+
+        self.wrap = wrap
+        self._offsets: list[float] = [0.0]  # wrap mode, top of every item (and the end), built lazily
+        self._ranges: list[tuple[float, float]] = []  # wrap mode, the widths the lines of each item are valid for
+        self._wrapped: dict[int, tuple[str, ...]] = {}  # wrap mode, index -> lines currently shown
+
+    def _wrapItem(self, index: int) -> tuple[tuple[str, ...], float, float]:
+        return GLOBAL_TextLayout.wrap_range(self.font, self.getText(index), self.width - self.PADDING * 2)
+
+    def _layout(self) -> list[float]:
+        offsets = self._offsets
+        if len(offsets) > self.count + 1:
+            del offsets[self.count + 1:]
+            del self._ranges[self.count:]
+        while len(offsets) <= self.count:  # new items at the end only lay out themselves
+            lines, lo, hi = self._wrapItem(len(offsets) - 1)
+            self._ranges.append((lo, hi))
+            offsets.append(offsets[-1] + len(lines) * self.rowHeight)
+        return offsets
+
+    def _prepend(self, added: int):
+        """
+        Lays out the items added in front and shifts the laid out ones (wrap mode), nothing else is re-wrapped.
+        """
+        offsets = [0.0]
+        ranges = []
+        for index in range(added):
+            lines, lo, hi = self._wrapItem(index)
+            ranges.append((lo, hi))
+            offsets.append(offsets[-1] + len(lines) * self.rowHeight)
+
+        shift = offsets[-1]
+        offsets.extend(top + shift for top in self._offsets[1:])
+        self._offsets = offsets
+        self._ranges = ranges + self._ranges
+        self._wrapped = {index + added: lines for index, lines in self._wrapped.items()}
+
+    def _reflow(self):
+        """
+        Lays the items out for a new width (wrap mode), only the ones whose lines are not valid for it are re-wrapped.
+        """
+        width = self.width - self.PADDING * 2
+        offsets = self._offsets
+        top = 0.0
+        for index, (lo, hi) in enumerate(self._ranges):
+            height = offsets[index + 1] - offsets[index]
+            if not lo <= width < hi:
+                lines, lo, hi = self._wrapItem(index)
+                self._ranges[index] = (lo, hi)
+                height = len(lines) * self.rowHeight
+                self._wrapped.pop(index, None)
+            offsets[index] = top
+            top += height
+        offsets[len(self._ranges)] = top
+
+    def item_top(self, index: int) -> float:
+        """
+        The distance between the top of the list and the top of an item.
+        """
+        return self._layout()[index] if self.wrap else index * self.rowHeight
+
+    def index_at(self, y: float) -> int:
+        """
+        The item at a distance from the top of the list (clamped to the items).
+        """
+        if self.wrap:
+            index = bisect.bisect_right(self._layout(), y) - 1
         else:
-            t = self.text
-            self.font.render_to(screen, (self.centerx - self.font.get_rect(t, size=self.font.size).width // 2,
-                                         self.centery - self.font.get_rect(t, size=self.font.size).height // 2), t)
+            index = int(y // self.rowHeight)
+        return min(max(index, 0), max(self.count - 1, 0))
+
+    @property
+    def contentHeight(self) -> float:
+        return self._layout()[self.count] if self.wrap else self.count * self.rowHeight
+
+    @property
+    def maxScroll(self) -> float:
+        return max(self.contentHeight - self.height, 0)
+
+    @property
+    def atBottom(self) -> bool:
+        return self.scroll >= self.maxScroll - 1
+
+    def visible_range(self) -> tuple[int, int]:
+        """
+        :return: (first, last) indexes that are laid out (last is exclusive), includes the overscan.
+        """
+        if self.wrap:
+            offsets = self._layout()
+            first = max(bisect.bisect_right(offsets, self.scroll) - 1 - self.overscan, 0)
+            last = min(bisect.bisect_left(offsets, self.scroll + self.height) + self.overscan, self.count)
+            return first, last
+
+        first = max(int(self.scroll // self.rowHeight) - self.overscan, 0)
+        last = min(int((self.scroll + self.height) // self.rowHeight) + 1 + self.overscan, self.count)
+        return first, last
+
+    def scroll_by(self, dy: float):
+        self.scroll = min(max(self.scroll + dy, 0), self.maxScroll)
+        self.invalidate()
+        if self.scroll == 0 and self.onReachTop is not None and self.maxScroll > 0:
+            self.onReachTop()
+
+    def scroll_to_bottom(self):
+        self.scroll = self.maxScroll
+        self.invalidate()
+
+    def set_count(self, count: int, added_front: int = 0, stick: bool = None):
+        """
+        Changes the amount of items.
+        Sticks to the bottom if it was already there (new messages), keeps the view still when items are added in front.
+        :param int count: The new amount of items.
+        :param int added_front: How many of the new items were inserted before the old first item.
+        :param bool stick: Always scroll to the bottom (True) or never (False), optional defaults to only if it was there.
+        """
+        if added_front:
+            # every index moved (getText already answers for the new ones), shift before anything is laid out
+            self.rows = {index + added_front: row for index, row in self.rows.items()}
+            if self.wrap:
+                self._prepend(added_front)
+            self.count += added_front
+            self.scroll += self.item_top(added_front)
+
+        if stick is None:
+            stick = self.atBottom
+        self.count = count
+        self.invalidate()
+
+        if stick:
+            self.scroll_to_bottom()
+        else:
+            self.scroll = min(self.scroll, self.maxScroll)
+
+    def refresh(self):
+        """
+        Forgets every row, use when the items changed (their text is asked again next draw).
+        """
+        self._free.extend(self.rows.values())
+        self.rows.clear()
+        self._wrapped.clear()
+        self._offsets = [0.0]  # laid out again on use
+        self._ranges = []
+        self.invalidate()
+
+    def resize(self, width: float, height: float):
+        """
+        Changes the size of the viewport, wrapped items are reflowed (only the ones whose lines change are re-wrapped).
+        Keeps the first visible item in place, or sticks to the bottom if it was there.
+        """
+        stick = self.atBottom
+        first = self.index_at(self.scroll)  # the first visible item (visible_range includes the overscan)
+        inside = self.scroll - self.item_top(first)
+
+        widthChanged = width != self.width
+        self.width = width
+        self.height = height
+        if self.wrap and widthChanged:
+            self._reflow()
+        self.invalidate()
+
+        if stick:
+            self.scroll_to_bottom()
+        else:
+            self.scroll = min(max(self.item_top(first) + inside, 0), self.maxScroll)
+
+    def _acquire(self, index: int) -> CUILabel:
+        text = self.getText(index).replace("\n", " ")  # one line per row
+        if self._free:
+            row = self._free.pop()
+            row.text = text
+        else:
+            row = CUILabel(0, 0, self.font, text)
+        return row
+
+    def tick(self, event: pygame.Event, mouse_pos: tuple[int, int]):
+        if event.type == pygame.MOUSEWHEEL and self.collidepoint(mouse_pos[0], mouse_pos[1]):
+            self.scroll_by(-event.y * self.rowHeight * 3)
+            return
+
+        if (event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self.onSelect is not None
+                and self.collidepoint(mouse_pos[0], mouse_pos[1])):
+            y = mouse_pos[1] - self.y + self.scroll
+            if y < self.contentHeight:
+                self.onSelect(self.index_at(y))
+            return
+
+        super().tick(event, mouse_pos)
+
+    def draw(self, screen: pygame.Surface, offset: Sequence[float] = (0, 0)) -> None:
+        first, last = self.visible_range()
+
+        for index in [i for i in self.rows if i < first or i >= last]:
+            self._free.append(self.rows.pop(index))
+
+        view = pygame.Rect(self.x - offset[0], self.y - offset[1], self.width, self.height)
+        pygame.draw.rect(screen, self.color, view)
+        oldClip = screen.get_clip()
+        screen.set_clip(view)
+
+        top = self.y - self.scroll
+        if self.wrap:
+            self._drawWrapped(screen, offset, first, last, top)
+            screen.set_clip(oldClip)
+            self.hasDrawn = True
+            return
+        for index in range(first, last):
+            row = self.rows.get(index)
+            if row is None:
+                row = self._acquire(index)
+                self.rows[index] = row
+
+            row.x = self.x + self.PADDING
+            row.y = top + index * self.rowHeight
+            row.draw(screen, offset)
+
+        screen.set_clip(oldClip)
+        self.hasDrawn = True
+
+    def _drawWrapped(self, screen: pygame.Surface, offset: Sequence[float], first: int, last: int, top: float):
+        for index in [i for i in self._wrapped if i < first or i >= last]:
+            del self._wrapped[index]
+
+        offsets = self._layout()
+        x = self.x + self.PADDING - offset[0]
+        for index in range(first, last):
+            lines = self._wrapped.get(index)
+            if lines is None:
+                lines = self._wrapItem(index)[0]
+                self._wrapped[index] = lines
+
+            y = top + offsets[index] - offset[1]
+            for i, line in enumerate(lines):
+                self.font.cached_render_to(screen, (x, y + i * self.rowHeight), line)
 
 
 class CUIManager:
     """
     Simple UI manager for objects.
+    Mouse events are routed with a grid of the object rects (only the objects under the cursor get them),
+    keyboard events only go to the focused object (the last pressed object that listens to KEYDOWN),
+    and every other event goes to the objects subscribed to its type.
+    WARN: The grid is built when objects are added, call update_object after moving/resizing an object
+          or changing its registeredEvents.
     :param list[CUIObject] objects: List of UI (CUIObject based) objects.
     :param bool onSurface: Whether the object is on a surface.
     :param tuple[float, float] pos: The position of the surface (offset)
     """
+    CELL_SIZE = 64
+    MOUSE_EVENTS = (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEWHEEL)
+    KEY_EVENTS = (pygame.KEYDOWN, pygame.KEYUP, pygame.TEXTINPUT)
 
     def __init__(self, objects: list[CUIObject], onSurface: bool = False, pos: tuple[float, float] = None):
         self.ui_objects = objects
@@ -627,24 +1605,80 @@ class CUIManager:
                 raise TypeError("Missing pos value for onSurface type! (required value!)")
             self.offset = pos
 
+        # objects are keyed by id(), rects compare (and hash) by value
+        self._cells: dict[tuple[int, int], list[CUIObject]] = {}
+        self._indexed: dict[int, tuple[list[tuple[int, int]], list[int]]] = {}  # id -> (cells, event types)
+        self._subscribers: dict[int, list[CUIObject]] = {}  # event type -> objects
+        self._order: dict[int, int] = {}  # id -> position in ui_objects, keeps the tick order of overlapping objects
+
+        self.focused: CUIObject | None = None
+        self.hovered: list[CUIObject] = []
+        self.pressed: list[CUIObject] = []
+
+        self.reindex()
+
+    def _index(self, obj: CUIObject) -> None:
+        cs = self.CELL_SIZE
+        cells = [(cx, cy)
+                 for cx in range(math.floor(obj.left) // cs, math.floor(obj.right) // cs + 1)
+                 for cy in range(math.floor(obj.top) // cs, math.floor(obj.bottom) // cs + 1)]
+        types = list(obj.registeredEvents)
+
+        for cell in cells:
+            self._cells.setdefault(cell, []).append(obj)
+        for t in types:
+            self._subscribers.setdefault(t, []).append(obj)
+        self._indexed[id(obj)] = (cells, types)
+
+    def _unindex(self, obj: CUIObject) -> None:
+        cells, types = self._indexed.pop(id(obj), ((), ()))
+        for cell in cells:
+            objs = self._cells[cell]
+            objs[:] = [o for o in objs if o is not obj]
+            if not objs:
+                del self._cells[cell]
+        for t in types:
+            objs = self._subscribers[t]
+            objs[:] = [o for o in objs if o is not obj]
+            if not objs:
+                del self._subscribers[t]
+
+        for tracked in (self.hovered, self.pressed):
+            tracked[:] = [o for o in tracked if o is not obj]
+        if self.focused is obj:
+            self.focused = None
+
+    def reindex(self) -> None:
+        """
+        Rebuilds the whole grid and subscriber map (ex: after changing ui_objects directly).
+        """
+        self._cells.clear()
+        self._indexed.clear()
+        self._subscribers.clear()
+        self._order = {id(obj): i for i, obj in enumerate(self.ui_objects)}
+        for obj in self.ui_objects:
+            self._index(obj)
+
     def add_object(self, obj: CUIObject) -> None:
         """
         Adds UI objects.
         :param obj: Any UI object.
         :return: None
         """
-        if obj not in self.ui_objects:
+        if id(obj) not in self._indexed:
+            self._order[id(obj)] = len(self.ui_objects)
             self.ui_objects.append(obj)
+            self._index(obj)
 
     def update_object(self, obj: CUIObject) -> None:
         """
-        Updates UI objects.
+        Updates UI objects, call after moving/resizing an object or changing its registeredEvents.
         :param obj: Any UI object.
         :return: None
         """
-        if obj in self.ui_objects:
-            i = self.ui_objects.index(obj)
-            self.ui_objects[i] = obj
+        if id(obj) in self._indexed:
+            self._unindex(obj)
+            self._index(obj)
 
     def remove_object(self, obj: CUIObject) -> None:
         """
@@ -652,25 +1686,73 @@ class CUIManager:
         :param obj: Any UI object.
         :return:
         """
-        if obj in self.ui_objects:
-            self.ui_objects.remove(obj)
+        if id(obj) in self._indexed:
+            self._unindex(obj)
+            self.ui_objects[:] = [o for o in self.ui_objects if o is not obj]
+            self._order = {id(o): i for i, o in enumerate(self.ui_objects)}
+
+    def objects_at(self, x: float, y: float) -> list[CUIObject]:
+        """
+        The objects under a point, in tick order.
+        Not filtered on hasDrawn: ticks clear it and idle frames are skipped, so it says nothing about visibility.
+        :return: list[CUIObject]
+        """
+        cs = self.CELL_SIZE
+        objs = [obj for obj in self._cells.get((math.floor(x) // cs, math.floor(y) // cs), ())
+                if obj.collidepoint(x, y)]
+        if len(objs) > 1:
+            objs.sort(key=lambda o: self._order[id(o)])
+        return objs
+
+    def _route(self, event: pygame.Event, mp: list[float]) -> list[CUIObject]:
+        if event.type in self.MOUSE_EVENTS:
+            targets = [obj for obj in self.objects_at(mp[0], mp[1]) if event.type in obj.registeredEvents]
+            # objects that were hovered/pressed also need the event, to notice the mouse left them
+            if event.type == pygame.MOUSEMOTION:
+                previous = self.hovered
+                self.hovered = targets
+            elif event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+                previous = self.pressed
+            else:
+                previous = ()
+
+            for obj in previous:
+                if event.type in obj.registeredEvents and all(obj is not t for t in targets):
+                    targets.append(obj)
+            return targets
+
+        subscribers = self._subscribers.get(event.type, ())
+        if event.type in self.KEY_EVENTS:
+            # focusable objects (buttons, inputs) only get keys while focused
+            return [obj for obj in subscribers if obj is self.focused or not hasattr(obj, "isPressed")]
+
+        return list(subscribers)
 
     def tick(self, events: list[pygame.Event]):
+        prof = profiler.ACTIVE
+        start = time.perf_counter() if prof is not None else 0.0
+
         mp = pygame.mouse.get_pos()
         mp = [mp[0], mp[1]]
         if self.offset:  # ensures offset is used
             mp[0] -= self.offset[0]
             mp[1] -= self.offset[1]
 
-        for obj in [obj for obj in self.ui_objects if obj.hasDrawn]:  # redefined to only tick visible objects.
-            ne = [event for event in events if
-                  event.type in obj.registeredEvents]  # only keeps events that are important.
-            if len(ne) == 0:
-                continue
-
-            for e in ne:
+        for e in events:
+            targets = self._route(e, mp)
+            for obj in targets:
                 obj.tick(e, mp)  # noqa ; tuple[int, int] basically list[int]
 
+            if e.type == pygame.MOUSEBUTTONDOWN:
+                self.pressed = [obj for obj in targets if getattr(obj, "isPressed", False)]
+                focus = [obj for obj in self.pressed if pygame.KEYDOWN in obj.registeredEvents]
+                self.focused = focus[0] if focus else None
+            elif self.focused is not None and not getattr(self.focused, "isPressed", True):
+                self.focused = None  # let go by itself (ex: enter in a text input)
+
+        if prof is not None:
+            prof.record("tick", start, time.perf_counter())
+
 
 class CGClock:
     """
@@ -729,9 +1811,195 @@ class CGClock:
         return self._clock.get_rawtime()
 
 
+class CUIProfilerOverlay:
+    """
+    Draws the libs.profiler state over the window: a frame time graph, p50/p99 and the slowest widgets.
+    Drawn on the scaled window (not the prescaled surface), so it always has the same size.
+    :param int graphFrames: The amount of frames in the graph.
+    """
+    WIDTH = 280
+    HEIGHT = 150
+    GRAPH_HEIGHT = 60
+    BUDGET_MS = 1000 / 60
+
+    def __init__(self, graphFrames: int = 140):
+        self.graphFrames = graphFrames
+        self._font: pygame.freetype.Font | None = None  # created on first draw (the default font, no file needed)
+        self._panel: pygame.Surface | None = None
+
+    def draw(self, surface: pygame.Surface, prof: profiler.Profiler) -> pygame.Rect:
+        """
+        :return: The area drawn to.
+        """
+        if self._font is None:
+            self._font = pygame.freetype.Font(None, 12)
+            self._font.fgcolor = CUColor.WHITE()
+            self._panel = pygame.Surface((self.WIDTH, self.HEIGHT), pygame.SRCALPHA)
+
+        panel = self._panel
+        panel.fill((0, 0, 0, 180))
+
+        # frame time bars, the line is the 60fps budget
+        times = prof.frame_times()[-self.graphFrames:]
+        barWidth = self.WIDTH / self.graphFrames
+        scale = self.GRAPH_HEIGHT / (self.BUDGET_MS * 2)
+        for i, ms in enumerate(times):
+            h = min(ms * scale, self.GRAPH_HEIGHT)
+            color = (90, 200, 90) if ms <= self.BUDGET_MS else (230, 80, 80)
+            panel.fill(color, (math.floor(i * barWidth), self.GRAPH_HEIGHT - h, math.ceil(barWidth), h))
+        budgetY = self.GRAPH_HEIGHT - self.BUDGET_MS * scale
+        pygame.draw.line(panel, (255, 255, 255), (0, budgetY), (self.WIDTH, budgetY))
+
+        summary = prof.summary(slowest=3)
+        phases = " ".join(f"{name} {summary['phasesMs'].get(name, 0.0):.1f}" for name in profiler.PHASES)
+        lines = [f"p50 {summary['p50Ms']:.1f}ms  p99 {summary['p99Ms']:.1f}ms  max {summary['maxMs']:.1f}ms",
+                 phases]
+        lines += [f"{w['name']}: {w['meanMs']:.2f}ms (max {w['maxMs']:.2f})" for w in summary["slowestWidgets"]]
+        for i, line in enumerate(lines):
+            self._font.render_to(panel, (4, self.GRAPH_HEIGHT + 6 + i * 16), line)
+
+        return surface.blit(panel, (0, 0))
+
+
+class CUIFrameScheduler:
+    """
+    Decides whether a frame has to be drawn at all, and sleeps (pygame.event.wait) while nothing changed.
+    A frame is needed when an object is dirty, the screen has something to present, invalidate() was called
+    or a requested frame (request_frame, for animations) is due.
+    Other threads wake it up with wake() (ex: from an events lane hook).
+    Created by CScaleScreen when it has a clock, use screen.scheduler.
+    Usage:
+        events = scheduler.get_events(objs)  # sleeps while idle
+        ... handle events ...
+        if scheduler.draw_needed(objs):
+            screen.redraw(objs, bg)
+            screen.present()
+            scheduler.frame_done()
+    :param CScaleScreen screen: The screen (its clock is used to cap the framerate).
+    :param float idleTimeout: The longest it sleeps without any event, in seconds.
+    """
+    WAKE: int | None = None  # the custom pygame event type posted by wake()
+
+    def __init__(self, screen, idleTimeout: float = 1.0):
+        if CUIFrameScheduler.WAKE is None:
+            CUIFrameScheduler.WAKE = pygame.event.custom_type()
+
+        self.screen = screen
+        self.idleTimeout = idleTimeout
+        self._invalid = True
+        self._deadline: float | None = None  # time.perf_counter() of the next requested frame
+        self.menu = ""  # the menu currently using the scheduler, only used by the profiler
+
+        self.frames = 0
+        self.skipped = 0
+        self.idleTime = 0.0
+
+    def invalidate(self):
+        """
+        Forces the next frame to be drawn.
+        """
+        self._invalid = True
+
+    def request_frame(self, delay: float = 0):
+        """
+        Asks for a frame in delay seconds, even if nothing changes (ex: the next step of an animation).
+        """
+        deadline = time.perf_counter() + delay
+        if self._deadline is None or deadline < self._deadline:
+            self._deadline = deadline
+
+    def wake(self):
+        """
+        Wakes up get_events from any thread.
+        """
+        pygame.event.post(pygame.event.Event(CUIFrameScheduler.WAKE))
+
+    def needs_frame(self, objs: list[CUIObject]) -> bool:
+        if self._invalid or self.screen.needs_present:
+            return True
+        if self._deadline is not None and self._deadline <= time.perf_counter():
+            return True
+        return any(obj.dirty for obj in objs)
+
+    def get_events(self, objs: list[CUIObject]) -> list[pygame.Event]:
+        """
+        Returns the pygame events, sleeping until one arrives if there is nothing to draw.
+        :param list[CUIObject] objs: The objects that are drawn, checked for dirty ones.
+        :return: list[pygame.Event]
+        """
+        if not self.needs_frame(objs):
+            if profiler.ACTIVE is not None:
+                profiler.ACTIVE.end_frame()  # the sleep is not part of any frame
+
+            timeout = self.idleTimeout
+            if self._deadline is not None:
+                timeout = min(timeout, max(self._deadline - time.perf_counter(), 0))
+
+            start = time.perf_counter()
+            first = pygame.event.wait(max(int(timeout * 1000), 1))
+            self.idleTime += time.perf_counter() - start
+            events = pygame.event.get()
+            if first.type != pygame.NOEVENT:
+                events.insert(0, first)
+        else:
+            self.screen.clock.tick()
+            events = pygame.event.get()
+
+        prof = profiler.ACTIVE
+        if prof is not None:
+            prof.begin_frame(self.menu)
+            start = time.perf_counter()
+
+        for event in events:
+            if event.type in (pygame.VIDEORESIZE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+                self.screen.mark_all_dirty()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self._profilerHotkey(event)
+
+        if prof is not None:
+            prof.record("events", start, time.perf_counter())  # noqa ; start is always set when profiling
+
+        return events
+
+    def _profilerHotkey(self, event: pygame.Event):
+        """
+        F3 toggles the profiler (and its overlay), Shift+F3 writes a trace of the recorded frames.
+        """
+        if event.mod & pygame.KMOD_SHIFT:
+            if profiler.ACTIVE is not None:
+                profiler.ACTIVE.export_trace(time.strftime("profile-%Y%m%d-%H%M%S.json"))
+            return
+
+        profiler.toggle()
+        self.screen.mark_all_dirty()  # puts back what was under the overlay
+
+    def draw_needed(self, objs: list[CUIObject]) -> bool:
+        """
+        Whether the frame has to be drawn (counts a skipped frame if not).
+        """
+        if self.needs_frame(objs):
+            return True
+
+        self.skipped += 1
+        return False
+
+    def frame_done(self):
+        self.frames += 1
+        self._invalid = False
+        if self._deadline is not None and self._deadline <= time.perf_counter():
+            self._deadline = None
+
+    def stats(self) -> dict:
+        return {"frames": self.frames, "skipped": self.skipped, "idleSeconds": self.idleTime}
+
+
 class CUIGroup:
     """
     Essentially a pygame.Surface that stores objects.
+    The children are composited once onto the group surface, and only composited again when one of them is
+    invalidated (or the group itself is), so a static panel costs one blit per frame.
+    Children are positioned relative to the group and clipped to its size, groups can be nested.
+    WARN: Non CUIObject children (CRect, CLine, ...) don't track changes, call invalidate() after changing them.
     :param size: Size of the surface.
     :param flags: Flags to pass to the pygame.Surface.
     """
@@ -747,18 +2015,70 @@ class CUIGroup:
         self.surface.fill(CUColor((255, 255, 255), 0))
 
         self.do_rotate = [False, 0]
+        self._rotated: tuple[float, pygame.Surface] | None = None  # (angle, rotated surface) of the last composite
 
         self.pos = [0, 0]
         self.objs: list[CUIObject] = []
+        self.parent: CUIGroup | None = None
+
+        self._invalid = True  # the surface has to be composited again
+        self.hasDrawn = False
+        self.drawnBounds: pygame.Rect | None = None  # same as CUIObject, set by CScaleScreen.redraw
+        self.composites = 0  # how many times the children were actually redrawn
 
-    def add_obj(self, obj: Union[CUIObject, BaseObject]):
+    @property
+    def dirty(self) -> bool:
+        """
+        Whether the group or any child changed since the last composite.
+        """
+        if self._invalid or self.do_rotate[0] != (self._rotated is not None):  # rotation (un)set changes the bounds
+            return True
+        return any(getattr(obj, "dirty", False) for obj in self.objs)
+
+    @dirty.setter
+    def dirty(self, value: bool):
+        if value:
+            self._invalid = True
+        # clearing is done by the next composite, the children still have to be redrawn
+
+    def invalidate(self):
+        """
+        Forces the children to be redrawn on the next draw (and marks the parent groups as changed).
+        """
+        self._invalid = True
+
+    @property
+    def absolute_pos(self) -> tuple[float, float]:
+        """
+        The position on the screen, going through the parent groups (ex: for a CUIManager offset).
+        """
+        x, y = self.pos
+        parent = self.parent
+        while parent is not None:
+            x += parent.pos[0]
+            y += parent.pos[1]
+            parent = parent.parent
+        return x, y
+
+    def bounds(self) -> pygame.Rect:
+        """
+        The area the group draws to, in the coordinates of whatever it is drawn on.
+        :return: pygame.Rect
+        """
+        size = self._rotated[1].get_size() if self._rotated is not None else self.surface.get_size()
+        return pygame.Rect(math.floor(self.pos[0]), math.floor(self.pos[1]), size[0] + 1, size[1] + 1)
+
+    def add_obj(self, obj: Union[CUIObject, BaseObject, "CUIGroup"]):
         """
         Add an object to the Group.
-        :param CUIObject obj: Any UI object.
+        :param CUIObject obj: Any UI object, or another CUIGroup.
         :return:
         """
-        if obj not in self.objs:
+        if all(o is not obj for o in self.objs):
             self.objs.append(obj)
+            if isinstance(obj, CUIGroup):
+                obj.parent = self
+            self.invalidate()
 
     def remove_obj(self, obj):
         """
@@ -766,40 +2086,68 @@ class CUIGroup:
         :param CUIObject obj: Any UI object.
         :return:
         """
-        if obj in self.objs:
-            del self.objs[self.objs.index(obj)]
+        if any(o is obj for o in self.objs):
+            self.objs = [o for o in self.objs if o is not obj]
+            if isinstance(obj, CUIGroup):
+                obj.parent = None
+            self.invalidate()
+
+    def composite(self) -> pygame.Surface:
+        """
+        Redraws the children if anything changed.
+        :return: The surface to blit (rotated if asked).
+        """
+        if self.dirty:
+            self.surface.fill(CUColor((255, 255, 255), 0))
+            for obj in self.objs:
+                obj.draw(self.surface)
+                if isinstance(obj, CUIObject):
+                    obj.dirty = False
+            self._invalid = False
+            self._rotated = None
+            self.composites += 1
+
+        if not self.do_rotate[0]:
+            self._rotated = None
+            return self.surface
+
+        angle = self.do_rotate[1]
+        self.do_rotate = [False, 0]
+        if self._rotated is None or self._rotated[0] != angle:
+            self._rotated = (angle, pygame.transform.rotate(self.surface, angle))
+        return self._rotated[1]
 
-    def draw(self, screen):
+    def draw(self, screen, offset: Sequence[float] = (0, 0)):
         """
         Draw the Group of UI objects to the screen.
-        :param screen: A CScreen to draw to.
+        :param screen: A CScreen, a pygame.Surface or the parent group surface to draw to.
+        :param offset: Subtracted from the position (ex: a camera).
         :return:
         """
-        self.surface.fill(CUColor((255, 255, 255), 0))
-        for obj in self.objs:
-            obj.draw(self.surface)
-
-        if self.do_rotate[0]:
-            surface = pygame.transform.rotate(self.surface, self.do_rotate[1])
-            self.do_rotate = [False, 0]
+        surface = self.composite()
+        pos = (self.pos[0] - offset[0], self.pos[1] - offset[1])
+        if isinstance(screen, pygame.Surface):
+            screen.blit(surface, pos)
         else:
-            surface = self.surface
-
-        screen.draw(surface, self.pos)
+            screen.draw(surface, pos)
+        self.hasDrawn = True
 
     def connect_manager(self, manager: CUIManager):
         """
         Connects a CUIManager to all the objects currently in the Group.
+        The manager should be made with onSurface=True and pos=group.absolute_pos, nested groups need their own manager.
         :param CUIManager manager: A UI Manager.
         :return:
         """
         for obj in self.objs:
-            manager.update_object(obj)
+            if isinstance(obj, CUIObject):
+                manager.add_object(obj)
 
     def rotate(self, degree: float):
         """
         Rotates the surface within the group.
         This function works by tasking the rotation to happen later (right before draw call)
+        The rotated surface is kept until the children or the angle change.
         :param float degree: The angle to rotate by (in degrees).
         """
         self.do_rotate = [True, degree]
@@ -919,10 +2267,19 @@ class CScaleScreen(CScreen):
     :param bool scrap: Whether to initialize the scrap (clipboard) module.
     :param bool clock: Whether to add a clock to the object.
     :param int fps: Sets the FPS for the clock, defaults to 60.
+    :param bool dirty: Dirty rect mode, only the areas marked with mark_dirty (or redrawn by redraw) are scaled and
+                       pushed to the window by present() (optional defaults to False, the whole screen every frame).
+    :param bool smooth: Use smoothscale instead of scale (slower, better looking when shrinking).
+    :param bool skipSameSize: Don't scale at all while the window is the same size as the prescaled surface
+                              (optional defaults to True).
     """
+    MAX_DIRTY_RECTS = 32  # past this many areas they are merged into one (each one costs a scale call)
+    SUBSURFACE_CACHE = 64  # (area, target) subsurface pairs kept by the dirty present, widgets repeat their areas
+
     def __init__(self, size: Sequence[float] = (0, 0), flags: int = 0, display: int = 0,
                  vsync: int = 0, caption: str = "No Caption Provided", icon: str = None, scrap: bool = False,
-                 clock: bool = False, fps: int = 60):
+                 clock: bool = False, fps: int = 60, dirty: bool = False, smooth: bool = False,
+                 skipSameSize: bool = True):
         super().__init__(size, flags | pygame.RESIZABLE, display, vsync, caption, icon, scrap, clock, fps)
         # some odd fix that patches prescaled not using updated size from the super func
         if size == (0, 0):
@@ -932,6 +2289,128 @@ class CScaleScreen(CScreen):
 
         self.prescaledSurface = pygame.Surface((self.size[0], self.size[1]), flags)
 
+        self.dirty = dirty
+        self.dirtyRects: list[pygame.Rect] = []  # in prescaled (logical) coordinates
+        self._fullRedraw = True  # the next present pushes everything (first frame, resize, fill)
+        self._updateRects: list[pygame.Rect] | None = None  # window areas for display.update, None means flip
+        self._lastSize = self.surface.get_size()
+
+        self.smooth = smooth
+        self.skipSameSize = skipSameSize
+        self._scaled: pygame.Surface | None = None  # persistent scale target, only reallocated on resize
+        self.scaleAllocations = 0  # how many times _scaled was (re)allocated, read by benchmarks
+        # (area, target) -> (prescaled subsurface, _scaled subsurface), only valid for the current _scaled
+        self._subsurfaces: collections.OrderedDict[tuple, tuple[pygame.Surface, pygame.Surface]] = \
+            collections.OrderedDict()
+        self.subsurfaceAllocations = 0  # how many subsurface pairs the dirty present created, read by benchmarks
+        self.overlay = CUIProfilerOverlay()  # drawn over the window by present() while libs.profiler is on
+
+        if clock:
+            self.scheduler = CUIFrameScheduler(self)
+
+    @property
+    def needs_present(self) -> bool:
+        """
+        Whether something was drawn (or marked) that did not reach the window yet.
+        """
+        return self._fullRedraw or bool(self.dirtyRects)
+
+    def mark_dirty(self, rect) -> None:
+        """
+        Marks an area of the prescaled surface as changed (only used in dirty rect mode).
+        :param rect: Any rect-like object, in prescaled coordinates.
+        """
+        self.dirtyRects.append(pygame.Rect(math.floor(rect[0]), math.floor(rect[1]),
+                                           math.ceil(rect[2]) + 1, math.ceil(rect[3]) + 1))
+
+    def mark_all_dirty(self) -> None:
+        self._fullRedraw = True
+
+    def redraw(self, objs: list[CUIObject], color: CUColor) -> None:
+        """
+        Draws the objects over a background color.
+        In dirty rect mode only the changed objects (and whatever overlaps them) are redrawn and marked,
+        otherwise (or on a full redraw) the whole screen is filled and everything is drawn.
+        :param list[CUIObject] objs: The objects, in draw order.
+        :param CUColor color: The background color.
+        """
+        prof = profiler.ACTIVE
+        start = time.perf_counter() if prof is not None else 0.0
+
+        if not self.dirty or self._fullRedraw:
+            self.prescaledSurface.fill(color)
+            for obj in objs:
+                if prof is None:
+                    obj.draw(self.prescaledSurface)
+                else:
+                    self._profiledDraw(obj, prof)
+                obj.dirty = False
+                obj.drawnBounds = obj.bounds()
+            self._fullRedraw = True
+        else:
+            self._redrawDirty(objs, color, prof)
+
+        if prof is not None:
+            prof.record("draw", start, time.perf_counter())
+
+    def _profiledDraw(self, obj: CUIObject, prof: profiler.Profiler) -> None:
+        start = time.perf_counter()
+        obj.draw(self.prescaledSurface)
+        prof.record_widget(getattr(obj, "tag", "") or obj.__class__.__name__, start, time.perf_counter())
+
+    def _redrawDirty(self, objs: list[CUIObject], color: CUColor, prof: profiler.Profiler | None) -> None:
+        areas = []
+        for obj in objs:
+            obj.hasDrawn = True  # still on screen, even if we don't draw it this frame
+            if not obj.dirty:
+                continue
+
+            bounds = obj.bounds()
+            areas.append(bounds.union(obj.drawnBounds) if obj.drawnBounds is not None else bounds)
+            obj.drawnBounds = bounds
+            obj.dirty = False
+
+        oldClip = self.prescaledSurface.get_clip()
+        for area in areas:
+            # repaint everything touching the area, so overlapping objects don't get erased
+            self.prescaledSurface.set_clip(area)
+            self.prescaledSurface.fill(color, area)
+            for obj in objs:
+                if obj.drawnBounds is None or obj.drawnBounds.colliderect(area):
+                    if prof is None:
+                        obj.draw(self.prescaledSurface)
+                    else:
+                        self._profiledDraw(obj, prof)
+            self.mark_dirty(area)
+        self.prescaledSurface.set_clip(oldClip)
+
+    def present(self) -> None:
+        """
+        Scales and pushes the frame to the window (use instead of before_flip + pygame.display.flip).
+        In dirty rect mode only the dirty areas reach the window.
+        """
+        prof = profiler.ACTIVE
+        if prof is None:
+            self.before_flip()
+        else:
+            start = time.perf_counter()
+            self.before_flip()
+            end = time.perf_counter()
+            prof.record("scale", start, end)
+            area = self.overlay.draw(self.surface, prof)
+            if self._updateRects is not None:
+                self._updateRects.append(area)
+            start = end
+
+        if self._updateRects is None:
+            pygame.display.flip()
+        elif self._updateRects:
+            pygame.display.update(self._updateRects)
+
+        self._updateRects = None
+        if prof is not None:
+            prof.record("flip", start, time.perf_counter())  # noqa ; start is always set when profiling
+
     def draw(self, obj, pos: Sequence[float] = None) -> None:
         if isinstance(obj, (CUIObject, CRect, BaseObject, pygame.FRect, pygame.Rect)):
             # check if its FRect or normal rect, if so then run just a default call.
@@ -943,9 +2422,7 @@ class CScaleScreen(CScreen):
             obj.draw(self.prescaledSurface)
 
         elif isinstance(obj, CUIGroup):  # since CUIGroups are surfaces, they will be in here as well.
-            raise ValueError("CUIGroups are currently not implemented correctly for this (bypasses scaler)")
-            # obj.draw(self)
-            # return self._post_draw()
+            obj.draw(self.prescaledSurface)  # the cached composite, only redrawn when a child changed
 
         elif isinstance(obj, pygame.Surface):
             if pos is None:
@@ -956,28 +2433,111 @@ class CScaleScreen(CScreen):
         else:
             raise TypeError("Object is not any drawable object!")
 
+    def _scaleTarget(self, size: tuple[int, int]) -> pygame.Surface:
+        """
+        The surface to scale into, same format as the prescaled surface (smoothscale and the dest form need that).
+        """
+        if self._scaled is None or self._scaled.get_size() != size:
+            self._scaled = pygame.Surface(size, 0, self.prescaledSurface)
+            self.scaleAllocations += 1
+            self._subsurfaces.clear()  # they point into the old buffer
+        return self._scaled
+
+    def _subsurfacePair(self, area: pygame.Rect, target: pygame.Rect) -> tuple[pygame.Surface, pygame.Surface]:
+        """
+        The prescaled area and the _scaled target as subsurfaces (they share the pixels), made once per area.
+        """
+        key = (area.x, area.y, area.width, area.height, target.x, target.y, target.width, target.height)
+        pair = self._subsurfaces.get(key)
+        if pair is None:
+            pair = (self.prescaledSurface.subsurface(area), self._scaled.subsurface(target))
+            self.subsurfaceAllocations += 1
+            self._subsurfaces[key] = pair
+            if len(self._subsurfaces) > self.SUBSURFACE_CACHE:
+                self._subsurfaces.popitem(last=False)
+        else:
+            self._subsurfaces.move_to_end(key)
+        return pair
+
+    def _scaleInto(self, src: pygame.Surface, dest: pygame.Surface) -> None:
+        if self.smooth:
+            pygame.transform.smoothscale(src, dest.get_size(), dest)
+        else:
+            pygame.transform.scale(src, dest.get_size(), dest)
+
     def before_flip(self):
         """
         MUST BE USED BEFORE FLIPPING THE SCREEN OTHERWISE YOU JUST HAVE A BLACK SCREEN!
+        Scales into a buffer kept between frames, nothing is allocated unless the window was resized.
         :return:
         """
         size = self.surface.get_size()
+        if size != self._lastSize:
+            self._lastSize = size
+            self._fullRedraw = True
+
+        unscaled = self.skipSameSize and size == self.prescaledSurface.get_size()
+
+        if not self.dirty or self._fullRedraw:
+            if unscaled:
+                self.surface.blit(self.prescaledSurface, (0, 0))
+            else:
+                scaled = self._scaleTarget(size)
+                self._scaleInto(self.prescaledSurface, scaled)
+                self.surface.blit(scaled, (0, 0))
+
+            self._fullRedraw = False
+            self.dirtyRects.clear()
+            self._updateRects = None
+            return
+
+        bounds = self.prescaledSurface.get_rect()
+        sx = size[0] / bounds.width
+        sy = size[1] / bounds.height
+        rects = [r.clip(bounds) for r in self.dirtyRects]
+        rects = [r for r in rects if r.width and r.height]
+        if len(rects) > self.MAX_DIRTY_RECTS:
+            rects = [rects[0].unionall(rects[1:])]
+
+        self._updateRects = []
+        if unscaled:
+            for r in rects:
+                self.surface.blit(self.prescaledSurface, r, r)
+                self._updateRects.append(r)
+            self.dirtyRects.clear()
+            return
+
+        scaled = self._scaleTarget(size)
+        for r in rects:
+            target = pygame.Rect(math.floor(r.x * sx), math.floor(r.y * sy), 0, 0)
+            target.width = math.ceil(r.right * sx) - target.x
+            target.height = math.ceil(r.bottom * sy) - target.y
+            target = target.clip(scaled.get_rect())
+            if not target.width or not target.height:
+                continue
 
-        scaled = pygame.transform.scale(self.prescaledSurface, size)
+            # only the area is scaled into the persistent buffer, through subsurfaces kept between frames
+            self._scaleInto(*self._subsurfacePair(r, target))
+            self.surface.blit(scaled, target, target)
+            self._updateRects.append(target)
 
-        self.surface.blit(scaled, (0, 0))
+        self.dirtyRects.clear()
 
     def fill(self, color: CUColor):
         """
         Fills the screen with a certain color.
+        In dirty rect mode this makes the next present() a full one, use redraw() to only repaint what changed.
         :param CUColor color: The Custom UI Color to fill the screen with.
         """
         self.prescaledSurface.fill(color=color)
+        self._fullRedraw = True
 
 
 class CGCamera:
     """
     A game camera
+    Objects are drawn with the camera position as an offset (they are never moved), and objects outside
+    the view are skipped, so only what is visible costs anything.
     :param pygame.Surface surface: The surface to render to.
     """
 
@@ -986,6 +2546,8 @@ class CGCamera:
         self._x = 0
         self._y = 0
 
+        self.culled = 0  # objects skipped because they were outside the view, read by benchmarks
+
     @property
     def x(self) -> float:
         return self._x
@@ -1002,6 +2564,14 @@ class CGCamera:
     def y(self, y: float):
         self._y = y
 
+    @property
+    def viewport(self) -> pygame.Rect:
+        """
+        The visible area, in world coordinates.
+        """
+        w, h = self.surface.get_size()
+        return pygame.Rect(math.floor(self._x), math.floor(self._y), w + 1, h + 1)
+
     def render(self, obj: Union[CRect, CUIGroup, BaseObject, pygame.Surface], pos: Sequence[float] = None):
         """
         Renders objects onto the screen based off the camera.
@@ -1009,63 +2579,28 @@ class CGCamera:
         :param Sequence[float] pos: The position to place the object. Optional for all except surfaces.
         :return:
         """
-        # this function is named 'render' instead of 'draw' because it is actively modifying things before drawing.
-        if isinstance(obj, CUIGroup):
-            # these objects work differently as it is just a group of objects
-            for o in obj.objs:
-                self.render(o)
-            return
-
-        elif isinstance(obj, CLine):
-            # these objects work differently, as it is a line that we have to move
-            os = [obj.start[0], obj.start[1]]
-            oe = [obj.end[0], obj.end[1]]
-            obj.start[0] -= self.x
-            obj.end[0] -= self.x
-            obj.start[1] -= self.y
-            obj.end[1] -= self.y
-
-            obj.draw(self.surface)
-
-            obj.start = os
-            obj.end = oe
-            return
+        # this function is named 'render' instead of 'draw' because it is drawing in world coordinates.
+        offset = (self._x, self._y)
+        view = self.viewport
 
-        elif isinstance(obj, CCircle):
-            # these objects work differently
-            oc = [obj.center[0], obj.center[1]]
-            obj.center[0] -= self.x
-            obj.center[1] -= self.y
-
-            obj.draw(self.surface)
-
-            obj.center = oc
-            return
-
-        elif isinstance(obj, pygame.Surface):
+        if isinstance(obj, pygame.Surface):
             if pos is None:
                 raise TypeError("Missing required positional argument, 'pos'! (required for pygame.Surface)")
 
-            npos = [pos[0], pos[1]]
-            npos[0] -= self.x
-            npos[1] -= self.y
+            if not view.colliderect(pygame.Rect(math.floor(pos[0]), math.floor(pos[1]), *obj.get_size())):
+                self.culled += 1
+                return
 
-            self.surface.blit(obj, npos)
+            self.surface.blit(obj, (pos[0] - offset[0], pos[1] - offset[1]))
             return
 
-        # save pos for later restore
-        ox = obj.x
-        oy = obj.y
-
-        # move obj
-        obj.x -= self.x
-        obj.y -= self.y
-
-        obj.draw(self.surface)
+        # groups too: culled as a whole by their bounds, then their cached composite is drawn at group.pos
+        bounds = obj.bounds()
+        if bounds is not None and not view.colliderect(bounds):
+            self.culled += 1
+            return
 
-        # restore pos
-        obj.x = ox
-        obj.y = oy
+        obj.draw(self.surface, offset)
 
 
 def init():
@@ -0,0 +1,81 @@
+"""
+Background worker pool, anything that blocks (API calls, file io) started from the render thread goes through here.
+The result comes back as a TaskResultEvent in the lane of the caller, so the render loop never waits on it.
+"""
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, CancelledError
+from libs import events as ev
+
+
+class Task:
+    """
+    A handle to a submitted job, menus keep this around to draw a pending state and to match the result event.
+    :param int taskId: Unique id of the task.
+    :param str name: A readable name (ex: "login"), only used for debugging.
+    """
+
+    def __init__(self, taskId: int, name: str):
+        self.id = taskId
+        self.name = name
+        self.future: Future | None = None
+
+    @property
+    def pending(self) -> bool:
+        return self.future is None or not self.future.done()
+
+    def __repr__(self):
+        return f"<Task {self.id} {self.name} {'pending' if self.pending else 'done'}>"
+
+
+class WorkerPool:
+    """
+    A thread pool that reports results through the events system.
+    :param int workers: The amount of worker threads.
+    """
+
+    def __init__(self, workers: int = 4):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="worker")
+        self._ids = itertools.count(1)
+
+    def submit(self, name: str, func, *args, lane: int = ev.RENDER, **kwargs) -> Task:
+        """
+        Runs func(*args, **kwargs) on a worker thread.
+        :param str name: A readable name for the task.
+        :param Callable func: The blocking function.
+        :param int lane: The events lane the TaskResultEvent is pushed to (optional defaults to RENDER).
+        :return: The Task (its result arrives as a TaskResultEvent).
+        """
+        task = Task(next(self._ids), name)
+
+        def done(future: Future):
+            if future.cancelled():  # future.exception() would raise, and nobody would hear about the task
+                ev.pushEvent(ev.TaskResultEvent(lane, task, error=CancelledError(), cancelled=True))
+                return
+
+            error = future.exception()
+            ev.pushEvent(ev.TaskResultEvent(lane, task, None if error else future.result(), error))
+
+        task.future = self._executor.submit(func, *args, **kwargs)
+        task.future.add_done_callback(done)
+        return task
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+GLOBAL_WorkerPool: WorkerPool | None = None
+_poolLock = threading.Lock()
+
+
+def getWorkerPool() -> WorkerPool:
+    """
+    Returns the shared WorkerPool (created on first use).
+    """
+    global GLOBAL_WorkerPool
+    if GLOBAL_WorkerPool is None:
+        with _poolLock:
+            if GLOBAL_WorkerPool is None:
+                GLOBAL_WorkerPool = WorkerPool()
+
+    return GLOBAL_WorkerPool
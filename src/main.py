@@ -2,8 +2,8 @@ from visual_application import Application
 from libs import events as ev
 from libs.logger import setupLogging, logging
 import threading
-import time
 from libs.config import Settings
+from gateway import GatewayClient
 
 
 def main():
@@ -17,6 +17,9 @@ def main():
 
     settings.LEVEL = logging.DEBUG
 
+    if settings.DEBUG:
+        ev.enableStats()  # look at them with ev.getStats() / ev.dumpStats()
+
     app = Application(settings)
 
     nVthread = threading.Thread(target=nonVisualCode, args=(settings,), daemon=True)
@@ -26,32 +29,75 @@ def main():
     app.run()
 
 
+def readyChannels(ready: dict) -> list[tuple[str, str]]:
+    """
+    The readable channels of a READY payload, direct messages first then the text channels of every guild.
+    :return: [(channel id, name), ...]
+    """
+    out = []
+    for c in ready.get("private_channels", []):
+        name = c.get("name") or ", ".join(r.get("global_name") or r.get("username", "?")
+                                          for r in c.get("recipients", []))
+        out.append((c["id"], "@" + name))
+
+    for g in ready.get("guilds", []):
+        guildName = g.get("name") or g.get("properties", {}).get("name", "?")
+        for c in sorted(g.get("channels", []), key=lambda x: x.get("position", 0)):
+            if c.get("type") in (0, 5):  # text and announcement channels
+                out.append((c["id"], f"{guildName} #{c.get('name', '?')}"))
+
+    return out
+
+
 def nonVisualCode(settings: Settings):
     """
     This function runs EVERYTHING other than visuals and rendering (it does send events between to talk to each-other!)
     :return:
     """
     token = ""
+    gateway: GatewayClient | None = None
+    channels: list[tuple[str, str]] = []  # (channel id, name), from READY
+
+    def onToken(ge: ev.TokenDataEvent):
+        nonlocal token, gateway
+        token = ge.token
+        if gateway is None:
+            gateway = GatewayClient(token, level=settings.LEVEL)
+            gateway.start()
+
+    def onRequestToken(ge: ev.RequestToken):
+        ev.pushEvent(ev.TokenDataEvent(1, token))
+
+    def onGatewayClosed(ge: ev.GatewayClosedEvent):
+        nonlocal gateway
+        gateway = None  # the next token starts a new one
+
+    def onRequestChannels(ge: ev.RequestChannels):
+        ev.pushEvent(ev.ChannelListEvent(channels))
+
+    def onDispatch(ge: ev.GatewayDispatchEvent):
+        nonlocal channels
+        if ge.name == "MESSAGE_CREATE":
+            from message_store import getMessageStore  # not needed before the first message, kept out of startup
+
+            # only channels we already have history for, the rest get fetched when opened
+            getMessageStore().add(ge.data["channel_id"], [ge.data], onlyCached=True)
+            ev.pushEvent(ev.MessageCreatedEvent(ge.data["channel_id"], ge.data))  # for the open channel
+        elif ge.name == "READY":
+            channels = readyChannels(ge.data)
+            ev.pushEvent(ev.ChannelListEvent(channels))
+
+    dispatcher = ev.Dispatcher()
+    dispatcher.register(ev.TokenDataEvent, onToken)
+    dispatcher.register(ev.RequestToken, onRequestToken)
+    dispatcher.register(ev.RequestChannels, onRequestChannels)
+    dispatcher.register(ev.GatewayDispatchEvent, onDispatch)
+    dispatcher.register(ev.GatewayClosedEvent, onGatewayClosed)
+
     ev.pushEvent(ev.TransitionMenuEvent(0))  # GOTO LOGIN
     while True:
-        gEvents = ev.getEvents()
-
-        for ge in gEvents:
-            if ge.type % 5 != 2:
-                # not our type of event
-                continue
-
-            if ge.type == 2:
-                ge: ev.TokenDataEvent
-                token = ge.token
-
-            elif ge.type == 7:
-                ge: ev.RequestToken
-                ev.pushEvent(ev.TokenDataEvent(1, token))
-
-            ev.removeEvent(ge)
-
-        time.sleep(0.1)  # to prevent overloading!
+        # sleeps until there is something for us (timeout just so the thread is never stuck forever)
+        dispatcher.dispatchAll(ev.waitEvents(ev.BACKEND, timeout=1))
 
 
 if __name__ == '__main__':
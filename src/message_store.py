@@ -0,0 +1,259 @@
+"""
+In-memory message history per channel, so switching back to a channel does not need another REST call.
+Messages are kept ordered by their snowflake id, cold channels are evicted (least recently used first)
+once the store holds more than its message budget.
+"""
+import bisect
+import collections
+import sys
+import threading
+from API import Request, VERSION
+
+PAGE_SIZE = 50  # the most messages Discord returns per request (max 100)
+MESSAGE_OVERHEAD = 1500  # rough bytes of a decoded message dict without its content, only used for the memory estimate
+
+
+def _fetchMessages(channelId: str, token: str, before: int | None, limit: int) -> list[dict]:
+    params = {"limit": limit}
+    if before is not None:
+        params["before"] = before
+
+    res = Request(VERSION.V9, "GET", f"/channels/{channelId}/messages", params=params,
+                  headers={"authorization": token}).execute()
+    res.raise_for_status()
+    return res.json()
+
+
+def _messageSize(message: dict) -> int:
+    return MESSAGE_OVERHEAD + sys.getsizeof(message.get("content", ""))
+
+
+class ChannelHistory:
+    """
+    The known messages of one channel, oldest first.
+    WARN: Only contains a continuous block of history (newest messages going back), never add a message with a gap.
+    :param str channelId: The channel id.
+    """
+
+    def __init__(self, channelId: str):
+        self.channelId = channelId
+        self.ids: list[int] = []  # sorted snowflakes
+        self.messages: dict[int, dict] = {}
+        self.reachedStart = False  # True once a fetch came back with less than asked (nothing older exists)
+        self.size = 0  # estimated bytes
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def oldest(self) -> int | None:
+        return self.ids[0] if self.ids else None
+
+    def add(self, messages: list[dict]) -> int:
+        """
+        Adds (or replaces) messages, in any order.
+        :return: The change in estimated bytes.
+        """
+        before = self.size
+        for m in messages:
+            mid = int(m["id"])
+            if mid in self.messages:
+                self.size -= _messageSize(self.messages[mid])
+            elif not self.ids or mid > self.ids[-1]:
+                self.ids.append(mid)  # new messages (the common case) go at the end
+            else:
+                bisect.insort(self.ids, mid)
+
+            self.messages[mid] = m
+            self.size += _messageSize(m)
+
+        return self.size - before
+
+    def latest(self, limit: int) -> list[dict]:
+        return [self.messages[i] for i in self.ids[-limit:]]
+
+    def before(self, beforeId: int, limit: int) -> list[dict]:
+        """
+        :return: Up to limit messages older than beforeId, oldest first.
+        """
+        end = bisect.bisect_left(self.ids, beforeId)
+        return [self.messages[i] for i in self.ids[max(end - limit, 0):end]]
+
+
+class MessageStore:
+    """
+    Every cached channel history, with LRU eviction.
+    Safe to use from multiple threads (fetches run on workers while the render thread reads).
+    :param int maxMessages: The amount of messages to keep before evicting cold channels.
+    :param Callable fetch: fetch(channelId, token, before, limit) -> list[dict] newest first
+                           (optional defaults to the REST api, swapped out by benchmarks).
+    """
+
+    def __init__(self, maxMessages: int = 50000, fetch=None):
+        self.maxMessages = maxMessages
+        self.fetch = fetch if fetch is not None else _fetchMessages
+        self.channels: collections.OrderedDict[str, ChannelHistory] = collections.OrderedDict()
+        self._pending: dict[str, list[dict]] = {}  # channels whose first page is being fetched -> messages meanwhile
+        self._lock = threading.RLock()
+
+        self.messageCount = 0
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def has(self, channelId: str) -> bool:
+        return channelId in self.channels
+
+    def _channel(self, channelId: str) -> ChannelHistory:
+        history = self.channels.get(channelId)
+        if history is None:
+            history = ChannelHistory(channelId)
+            self.channels[channelId] = history
+        else:
+            self.channels.move_to_end(channelId)
+        return history
+
+    def add(self, channelId: str, messages: list[dict], onlyCached: bool = False):
+        """
+        Adds messages to a channel (ex: MESSAGE_CREATE from the gateway).
+        :param bool onlyCached: Drop the messages if the channel is not cached (don't create histories for every channel),
+                                kept until the fetch ends for a channel whose first page is being fetched.
+        """
+        with self._lock:
+            if onlyCached and channelId not in self.channels:
+                if channelId in self._pending:
+                    self._pending[channelId].extend(messages)
+                return
+
+            history = self._channel(channelId)
+            count = len(history)
+            self.size += history.add(messages)
+            self.messageCount += len(history) - count
+            self._evict(keep=channelId)
+
+    def _evict(self, keep: str):
+        while self.messageCount > self.maxMessages and len(self.channels) > 1:
+            channelId, history = next(iter(self.channels.items()))
+            if channelId == keep:
+                self.channels.move_to_end(channelId)
+                continue
+
+            del self.channels[channelId]
+            self.messageCount -= len(history)
+            self.size -= history.size
+            self.evictions += 1
+
+    def cached(self, channelId: str, limit: int = PAGE_SIZE) -> list[dict] | None:
+        """
+        The newest messages of a channel if they are all in memory (counted as a hit), otherwise None (a miss).
+        Never blocks, safe to call from the render thread.
+        :return: Up to limit messages (oldest first) or None.
+        """
+        with self._lock:
+            history = self.channels.get(channelId)
+            if history is not None and (len(history) >= limit or history.reachedStart):
+                self.channels.move_to_end(channelId)
+                self.hits += 1
+                return history.latest(limit)
+
+            self.misses += 1
+            return None
+
+    def load(self, channelId: str, token: str, limit: int = PAGE_SIZE) -> list[dict]:
+        """
+        Fetches what is missing for the newest page of a channel (use after cached returned None).
+        WARN: Blocks on a REST call, call from a worker (libs.worker).
+        :return: Up to limit messages, oldest first.
+        """
+        self.fetchOlder(channelId, token, None, limit)
+        with self._lock:
+            history = self.channels.get(channelId)
+            return history.latest(limit) if history is not None else []
+
+    def history(self, channelId: str, token: str, limit: int = PAGE_SIZE) -> list[dict]:
+        """
+        The newest messages of a channel, from memory when possible.
+        WARN: Blocks on a REST call on a miss, call from a worker (libs.worker).
+        :return: Up to limit messages, oldest first.
+        """
+        messages = self.cached(channelId, limit)
+        return messages if messages is not None else self.load(channelId, token, limit)
+
+    def fetchOlder(self, channelId: str, token: str, beforeId: int | str | None, limit: int = PAGE_SIZE) -> list[dict]:
+        """
+        Loads the page of messages before beforeId.
+        The page comes from memory as far as the history goes, only the part that is not cached is fetched.
+        With beforeId None the history is extended past its oldest message (the newest page for an unknown channel).
+        WARN: Blocks on a REST call when the page is not all cached, call from a worker (libs.worker).
+        :return: Up to limit messages older than beforeId, oldest first.
+        """
+        with self._lock:
+            history = self.channels.get(channelId)
+            cached = []
+            if history is None:
+                if beforeId is not None:
+                    before, store = int(beforeId), False  # a page alone would leave a gap, only served
+                else:
+                    before, store = None, True
+                    self._pending.setdefault(channelId, [])  # MESSAGE_CREATEs until the page is in
+            elif beforeId is None or history.oldest is None or int(beforeId) >= history.oldest:
+                if beforeId is not None:
+                    cached = history.before(int(beforeId), limit)
+                if len(cached) >= limit or history.reachedStart:
+                    return cached
+                before, store = history.oldest, True  # continue the history where it ends
+            else:
+                before, store = int(beforeId), False  # older than the history, the page would leave a gap
+
+        try:
+            messages = self.fetch(channelId, token, before, limit - len(cached))  # not holding the lock
+        finally:
+            if before is None:
+                with self._lock:
+                    created = self._pending.pop(channelId, [])
+            else:
+                created = []
+
+        if store:
+            with self._lock:
+                if before is not None and channelId not in self.channels:
+                    return list(reversed(messages)) + cached  # evicted while fetching, adding would leave a gap
+
+                self.add(channelId, messages)
+                if len(messages) < limit - len(cached):
+                    self._channel(channelId).reachedStart = True
+                if created:
+                    self.add(channelId, created)
+
+        return list(reversed(messages)) + cached
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "channels": len(self.channels),
+                "messages": self.messageCount,
+                "estimatedBytes": self.size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+GLOBAL_MessageStore: MessageStore | None = None
+_storeLock = threading.Lock()
+
+
+def getMessageStore() -> MessageStore:
+    """
+    Returns the shared MessageStore (created on first use).
+    """
+    global GLOBAL_MessageStore
+    if GLOBAL_MessageStore is None:
+        with _storeLock:
+            if GLOBAL_MessageStore is None:
+                GLOBAL_MessageStore = MessageStore()
+
+    return GLOBAL_MessageStore
@@ -1,10 +1,17 @@
+import importlib
 from libs import events as ev
 from libs import config
 from libs import ui
 from libs.logger import LoggingBase
 import pygame
-from zMENU_login import LoginMenu
-from zMENU_msgs import MsgsMenu
+from zMENU_base import Menu
+
+# (module, class) of every menu, by TransitionMenuEvent.goto
+# menus are imported and built on their first transition, a menu that is never shown costs nothing at startup
+MENUS = [
+    ("zMENU_login", "LoginMenu"),
+    ("zMENU_msgs", "MsgsMenu"),
+]
 
 
 class Application(LoggingBase):
@@ -13,39 +20,74 @@ class Application(LoggingBase):
         pygame.init()
         self.settings = settings
 
-        self.screen = ui.CScaleScreen(size=(1080, 720), caption="ModCord (Made by Duve3)", scrap=True, clock=True)
+        self.screen = ui.CScaleScreen(size=(1080, 720), caption="ModCord (Made by Duve3)", scrap=True, clock=True,
+                                     dirty=True)
         # ^ clock is used for ensuring videos, and gifs don't go too fast or too slow.
+        # the menus sleep in pygame.event.wait while idle, backend events have to wake them up
+        ev.setWakeHook(ev.RENDER, self.screen.scheduler.wake)
+
+        self.menus: dict[int, Menu] = {}  # the menus built so far
+        self.active: Menu | None = None
+
+        self.dispatcher = ev.Dispatcher()
+        self.dispatcher.register(ev.TokenDataEvent, lambda ge: None)  # we don't really care :shrug: <- but we also want to eat up the event!
+        self.dispatcher.register(ev.TransitionMenuEvent, self.onTransition)
 
-        self.menus = [
-            LoginMenu(self.screen, settings),
-            MsgsMenu(self.screen, settings)
-        ]
+    def onTransition(self, ge: ev.TransitionMenuEvent):
+        self.switch(ge.goto)
+
+    def menu(self, index: int) -> Menu:
+        """
+        Returns a menu, importing and building it the first time.
+        """
+        menu = self.menus.get(index)
+        if menu is None:
+            module, name = MENUS[index]
+            menu = getattr(importlib.import_module(module), name)(self.screen, self.settings)
+            self.menus[index] = menu
+        return menu
 
-        self.prepareSwitch: int = -1
+    def switch(self, index: int):
+        """
+        Makes another menu the active one (takes effect on the next frame).
+        """
+        menu = self.menu(index)
+        if self.active is not None:
+            self.active.leave()
+        self.active = menu
+        self.active.enter()
 
     def run(self):
         """
-        This run loop has zero visual code, it simply just handles events
+        The one frame loop of every menu, sleeps while nothing happens (see CUIFrameScheduler).
+        Returns when the window is closed.
         :return:
         """
+        while self.active is None:  # nothing to show until the backend picks the first menu
+            self.dispatcher.dispatchAll(ev.waitEvents(ev.RENDER, timeout=1))
+
+        scheduler = self.screen.scheduler
         while True:
-            gevents = ev.getEvents()
-            for ge in gevents:
-                if ge.type % 5 != 1:
-                    # this event is not meant for the render!
-                    continue
+            menu = self.active
+            events = scheduler.get_events(menu.objs)  # sleeps while nothing changes
+
+            for event in events:
+                if event.type == pygame.QUIT:
+                    return
 
-                if ge.type == 1:
-                    pass  # we don't really care :shrug: <- but we also want to eat up the event!
+            menu.update(events)
 
-                elif ge.type == 6:
-                    ge: ev.TransitionMenuEvent
-                    self.prepareSwitch = ge.goto
+            for ge in ev.popEvents(ev.RENDER):
+                # a transition switches right away, the events after it are for the new menu
+                if isinstance(ge, ev.TransitionMenuEvent) or not self.active.dispatcher.dispatch(ge):
+                    self.dispatcher.dispatch(ge)
 
-                ev.removeEvent(ge)
+            if self.active is not menu:
+                continue  # the new menu draws everything on the next frame
 
-            if self.prepareSwitch != -1:
-                runFunc = self.menus[self.prepareSwitch].run
-                self.prepareSwitch = -1
+            if not scheduler.draw_needed(menu.objs):
+                continue
 
-                runFunc()
+            menu.draw()
+            self.screen.present()
+            scheduler.frame_done()
@@ -0,0 +1,52 @@
+"""
+The base of every menu, menus are driven by Application (one frame loop for all of them, no nested loops)
+"""
+import logging
+from libs import ui
+from libs import events as ev
+from libs.logger import LoggingBase
+import pygame
+
+
+class Menu(LoggingBase):
+    """
+    A screen of the application.
+    Application calls enter() when switching to it, then every frame:
+        update(events) -> its dispatcher gets the RENDER events -> draw() (only if something changed)
+    Subclasses fill objs/manager and register their handlers on dispatcher.
+    :param CScaleScreen screen: The screen.
+    :param int level: The logging level.
+    """
+    NAME = ""  # shown by the profiler
+    BACKGROUND = ui.CUColor((0, 0, 0))
+
+    def __init__(self, screen: ui.CScaleScreen, level: int = logging.INFO):
+        super().__init__(level)
+        self.screen = screen
+        self.objs: list[ui.CUIObject] = []  # drawn in this order
+        self.manager = ui.CUIManager([])
+        self.dispatcher = ev.Dispatcher()  # RENDER events for this menu, the rest goes to Application
+
+    def enter(self):
+        """
+        Called when the menu becomes the active one.
+        """
+        self.screen.mark_all_dirty()  # whatever the last menu drew is still there
+        self.screen.scheduler.menu = self.NAME
+
+    def leave(self):
+        """
+        Called when another menu becomes the active one.
+        """
+
+    def update(self, events: list[pygame.Event]):
+        """
+        Handles the pygame events of a frame.
+        """
+        self.manager.tick(events)
+
+    def draw(self):
+        """
+        Draws the frame (only called when something changed), Application presents it.
+        """
+        self.screen.redraw(self.objs, self.BACKGROUND)
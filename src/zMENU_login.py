@@ -4,20 +4,24 @@ The menu for logging into discord
 from libs import ui
 from libs import config
 from libs import events as ev
-from libs.logger import LoggingBase
+from libs import worker
 import pygame
 from API import login, LOGIN
+from zMENU_base import Menu
 
 
-class LoginMenu(LoggingBase):
+class LoginMenu(Menu):
+    NAME = "login"
+    BACKGROUND = ui.CUColor((88, 101, 242))
+
     def __init__(self, screen: ui.CScaleScreen, settings: config.Settings):
-        super().__init__()
-        self.screen = screen
+        super().__init__(screen)
 
-        self.LABEL_title = ui.CUILabel(340, 200, ui.CUIFont(settings.COMFORT, 30, ui.CUColor.WHITE()),
+        fonts = ui.GLOBAL_FontRegistry  # each TTF is read once, whatever the amount of fonts made from it
+        self.LABEL_title = ui.CUILabel(340, 200, fonts.font(settings.COMFORT, 30, ui.CUColor.WHITE()),
                                        "Login to Discord (NO 2FA)")
 
-        basic_font = ui.CUIFont(settings.COMFORT, 20, ui.CUColor.WHITE())
+        basic_font = fonts.font(settings.COMFORT, 20, ui.CUColor.WHITE())
         self.TEXTBOX_email = ui.CUITextInput(440, 350, 200, 75, ui.CUColor((88, 101, 242)).darken(20, retColor=True),
                                              basic_font, "Email", onTextUpdate=lambda x: x, charLimit=100)
         self.TEXTBOX_pass = ui.CUITextInput(440, 450, 200, 75, ui.CUColor((88, 101, 242)).darken(20, retColor=True),
@@ -26,52 +30,48 @@ class LoginMenu(LoggingBase):
         self.BUTTON_login = ui.CUITextButton(500, 550, 75, 25, ui.CUColor((88, 101, 242)).darken(20, retColor=True),
                                              basic_font, "Login", onPress=self.login)
 
+        self.LABEL_status = ui.CUILabel(440, 600, fonts.font(settings.COMFORT, 20, ui.CUColor.WHITE()), "")
+
+        self.objs = [self.LABEL_title, self.TEXTBOX_email, self.TEXTBOX_pass, self.BUTTON_login, self.LABEL_status]
         self.manager = ui.CUIManager([self.TEXTBOX_email, self.TEXTBOX_pass, self.BUTTON_login])
+        self.dispatcher.register(ev.TaskResultEvent, self.onTaskResult)
+
+        self.loginTask: worker.Task | None = None  # set while a login request is in flight
 
     def login(self):
-        t: LOGIN | str = login(self.TEXTBOX_email.text, self.TEXTBOX_pass.text)
+        if self.loginTask is not None:
+            return  # already logging in, don't send it twice
+
+        # the request blocks for a whole round trip, so it runs on a worker (result comes back as a TaskResultEvent)
+        self.loginTask = worker.getWorkerPool().submit("login", login, self.TEXTBOX_email.text,
+                                                       self.TEXTBOX_pass.text)
+
+    def onTaskResult(self, ge: ev.TaskResultEvent):
+        if ge.task is self.loginTask:
+            self.onLoginResult(ge)
 
+    def onLoginResult(self, ge: ev.TaskResultEvent):
+        self.loginTask = None
+
+        if ge.error is not None:
+            self.logger.error(f"login request failed: {ge.error!r}")
+            self.LABEL_status.text = "Unable to reach Discord"
+            return
+
+        t: LOGIN | str = ge.result
         if t != LOGIN.INVALID:
+            self.LABEL_status.text = ""
             ev.pushEvent(ev.TokenDataEvent(1, t))  # inform our own program
             ev.pushEvent(ev.TokenDataEvent(2, t))  # inform backend
 
-            ev.pushEvent(ev.TransitionMenuEvent(1))
+            ev.pushEvent(ev.TransitionMenuEvent(1))  # Application switches menus once it gets it
             return
         else:
-            pass  # TODO: what happens when it fails!!1111 (push event upon ourself?)
-
-    def run(self):
-        while True:
-            self.screen.clock.tick(60)
-
-            events = pygame.event.get()
-            self.manager.tick(events)
-
-            for event in events:
-                if event.type == pygame.QUIT:
-                    return
-
-            gevents = ev.getEvents()
-            for ge in gevents:
-                if ge.type % 5 != 1:  # WE ARE STILL CONNECTED TO RENDERING!
-                    continue
-
-                if ge.type == 1:
-                    continue  # WE WANT FUTURE RENDERS TO DEAL WITH THIS, NOT US!
-
-                if ge.type == 6:
-                    return  # not only do we force a higher renderer to deal with it, we also allow it to handle it properly.
-
-                ev.removeEvent(ge)
-
-            self.screen.fill(ui.CUColor((88, 101, 242)))  # bg color
-
-            self.LABEL_title.draw(self.screen.prescaledSurface)
-
-            self.TEXTBOX_email.draw(self.screen.prescaledSurface)
-            self.TEXTBOX_pass.draw(self.screen.prescaledSurface)
+            self.LABEL_status.text = "Invalid login"  # TODO: captcha / 2FA errors end up here too
 
-            self.BUTTON_login.draw(self.screen.prescaledSurface)
+    def update(self, events: list[pygame.Event]):
+        super().update(events)
 
-            self.screen.before_flip()
-            pygame.display.flip()
+        if self.loginTask is not None:
+            self.LABEL_status.text = "Logging in" + "." * (pygame.time.get_ticks() // 400 % 4)
+            self.screen.scheduler.request_frame(0.4 - pygame.time.get_ticks() % 400 / 1000)  # next dot
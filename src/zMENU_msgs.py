@@ -1,28 +1,128 @@
+"""
+The menu for reading messages
+"""
 from libs import events as ev
 from libs import ui
 from libs import config
-from libs.logger import LoggingBase
-import pygame
+from libs import worker
+from message_store import getMessageStore
+from zMENU_base import Menu
 
 
-class MsgsMenu(LoggingBase):
+class MsgsMenu(Menu):
+    NAME = "messages"
+    BACKGROUND = ui.CUColor((43, 45, 49))
+
     def __init__(self, screen: ui.CScaleScreen, settings: config.Settings):
-        super().__init__(settings.LEVEL)
-        self.screen = screen
+        super().__init__(screen, settings.LEVEL)
+
+        self.token: str | None = None
+        self.store = getMessageStore()
+        self.channels: list[tuple[str, str]] = []  # (channel id, name), from the backend
+        self.channelId: str | None = None
+        self.messages: list[dict] = []  # the open channel, oldest first
+        self.loadTask: worker.Task | None = None
+        self.olderTask: worker.Task | None = None
+
+        font = ui.GLOBAL_FontRegistry.font(settings.COMFORT, 16, ui.CUColor.WHITE())
+        self.LIST_messages = ui.CUIVirtualList(250, 20, 810, 680, ui.CUColor((49, 51, 56)), font, 20,
+                                               self.messageText, onReachTop=self.loadOlder, wrap=True)
+        self.LIST_channels = ui.CUIVirtualList(20, 20, 210, 680, ui.CUColor((49, 51, 56)), font, 24,
+                                               self.channelText, onSelect=self.selectChannel)
+        self.objs = [self.LIST_channels, self.LIST_messages]
+        self.manager = ui.CUIManager([self.LIST_channels, self.LIST_messages])
+        self.dispatcher.register(ev.TokenDataEvent, self.onToken)
+        self.dispatcher.register(ev.TaskResultEvent, self.onTaskResult)
+        self.dispatcher.register(ev.ChannelListEvent, self.onChannelList)
+        self.dispatcher.register(ev.MessageCreatedEvent, self.onMessageCreated)
+
+    def messageText(self, index: int) -> str:
+        m = self.messages[index]
+        author = m.get("author", {})
+        return f"{author.get('global_name') or author.get('username', '?')}: {m.get('content', '')}"
+
+    def channelText(self, index: int) -> str:
+        channelId, name = self.channels[index]
+        return ("> " if channelId == self.channelId else "") + name
+
+    def selectChannel(self, index: int):
+        channelId = self.channels[index][0]
+        if channelId != self.channelId:
+            self.openChannel(channelId)
+
+    def openChannel(self, channelId: str):
+        """
+        Switches to a channel, served from the message store when possible (otherwise loaded on a worker).
+        """
+        self.channelId = channelId
+        self.LIST_channels.refresh()  # moves the marker of the open channel
+        self.olderTask = None
+        cached = self.store.cached(channelId)
+        self.loadTask = None
+        self.messages = cached if cached is not None else []
+        self.LIST_messages.refresh()
+        self.LIST_messages.set_count(len(self.messages))
+        self.LIST_messages.scroll_to_bottom()
+        if cached is not None:
+            return
+
+        if self.token is not None:
+            self.loadTask = worker.getWorkerPool().submit("load channel", self.store.load, channelId, self.token)
+
+    def loadOlder(self):
+        """
+        Loads the page before the oldest loaded message (called when the list is scrolled to the top).
+        """
+        if self.channelId is None or self.token is None or self.loadTask is not None or self.olderTask is not None:
+            return
+
+        self.olderTask = worker.getWorkerPool().submit("load older", self.store.fetchOlder, self.channelId, self.token,
+                                                       self.messages[0]["id"] if self.messages else None)
+
+    def onTaskResult(self, ge: ev.TaskResultEvent):
+        if ge.task is not self.loadTask and ge.task is not self.olderTask:
+            return  # a channel we already switched away from
+
+        if ge.error is not None:
+            self.loadTask = self.olderTask = None
+            self.logger.error(f"unable to load channel {self.channelId}: {ge.error!r}")
+            return
+
+        if ge.task is self.loadTask:
+            self.loadTask = None
+            self.messages = ge.result
+            self.LIST_messages.refresh()
+            self.LIST_messages.set_count(len(self.messages))
+            self.LIST_messages.scroll_to_bottom()
+        else:
+            self.olderTask = None
+            self.messages = ge.result + self.messages
+            self.LIST_messages.set_count(len(self.messages), added_front=len(ge.result))
+
+    def onChannelList(self, ge: ev.ChannelListEvent):
+        self.channels = ge.channels
+        self.LIST_channels.refresh()
+        self.LIST_channels.set_count(len(self.channels))
+        if self.channelId is None and self.channels:
+            self.openChannel(self.channels[0][0])
 
-    def run(self):
-        while True:
-            self.screen.clock.tick(60)
+    def onMessageCreated(self, ge: ev.MessageCreatedEvent):
+        if ge.channelId != self.channelId or self.loadTask is not None:
+            return  # the load brings it with the rest of the channel
 
-            events = pygame.event.get()
+        if self.messages and int(self.messages[-1]["id"]) >= int(ge.message["id"]):
+            return  # already there (came back with a load)
 
-            for event in events:
-                if event.type == pygame.QUIT:
-                    return
+        self.messages.append(ge.message)
+        self.LIST_messages.set_count(len(self.messages), stick=True)
 
-            gEvents = ev.getEvents()
-            for ge in gEvents:
-                if ge.type % 5 != 1:
-                    continue
+    def onToken(self, ge: ev.TokenDataEvent):
+        self.token = ge.token
+        if self.channelId is not None and not self.messages and self.loadTask is None:
+            self.openChannel(self.channelId)  # was opened before we had a token
 
-                ev.removeEvent(ge)
+    def enter(self):
+        super().enter()
+        if self.token is None:
+            ev.pushEvent(ev.RequestToken())  # the backend answers with a TokenDataEvent
+        ev.pushEvent(ev.RequestChannels())  # the list may have come while another menu was open